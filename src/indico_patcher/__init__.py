@@ -1,6 +1,11 @@
 # This file is part of indico-patcher.
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
+from .classes import batch_patches
+from .classes import compile_patches
+from .classes import patched
+from .classes import unpatch
+from .freezing import freeze
 from .main import patch
 
-__all__ = ["patch"]
+__all__ = ["batch_patches", "compile_patches", "freeze", "patch", "patched", "unpatch"]
@@ -1,17 +1,33 @@
 # This file is part of indico-patcher.
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
-from collections import defaultdict
+import threading
+import weakref
 from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import MappingProxyType
 from typing import Any
 from typing import cast
 
+from sqlalchemy.orm import configure_mappers
+
+from . import metrics
+from .freezing import ensure_unfrozen
+from .freezing import is_frozen
+from .registry import PatchRegistry
 from .types import ClassWrapper
 from .types import PatchedClass
+from .types import PatchSnapshot
+from .util import CachedClassProperty
+from .util import compile_super_calls
+from .util import deferred_indexing
 from .util import get_members
+from .util import patch_lock
 from .util import patch_member
+from .util import revert_members
 
-__all__ = ["patch_class"]
+__all__ = ["batch_patches", "compile_patches", "patch_class", "patched", "unpatch"]
 
 # Members that should not be overridden in the original class
 SKIPPED_MEMBERS = {
@@ -25,6 +41,22 @@ SKIPPED_MEMBERS = {
     "_sa_class_manager"
 }
 
+# Attributes tracking the patches of a class, with the callables creating their empty storage for a class
+PATCH_STORAGE: dict[str, Callable[[type], Any]] = {
+    "__patches__": lambda owner: [],
+    "__unpatched__": lambda owner: PatchRegistry(owner=owner),
+    "__resolution__": lambda owner: {},
+}
+
+# Patch classes collected in the batch of each thread, per original class
+_local = threading.local()
+
+# Classes patched so far
+_patched_classes: weakref.WeakSet[PatchedClass] = weakref.WeakSet()
+
+# Snapshots of the classes patched within each active `patched()` context, before their first patch
+_recorders: list[dict[PatchedClass, PatchSnapshot | None]] = []
+
 
 def patch_class(orig_class: type) -> ClassWrapper:
     """Decorator to patch a given class with members from the decorated class.
@@ -38,35 +70,211 @@ def patch_class(orig_class: type) -> ClassWrapper:
         raise TypeError("Cannot patch built-in classes")
     # Hint type checker that the class becomes a PatchedClass
     cls = cast(PatchedClass, orig_class)
-    # Store patches and original members of the class
-    # XXX: We use `__dict__` instead of `getattr` to avoid retrieving patches
-    #      from parent classes, which would cause infinite recursion when
-    #      patching multiple classes in the same hierarchy.
-    cls.__patches__ = cls.__dict__.get("__patches__", [])
-    cls.__unpatched__ = cls.__dict__.get("__unpatched__",defaultdict(lambda: defaultdict(list)))
-    # Reset patch storage for subclasses
-    cls.__init_subclass__ = classmethod(_create_subclass_patch_reset(cls.__init_subclass__))  # type: ignore[assignment]
+    with patch_lock:
+        ensure_unfrozen()
+        # Keep track of the state of the class before its first patch in each patched() context
+        for recorder in _recorders:
+            if cls not in recorder:
+                recorder[cls] = _take_snapshot(cls)
+        # Store patches and original members of the class
+        # XXX: We use `__dict__` instead of `getattr` to avoid retrieving patches
+        #      from parent classes, which would cause infinite recursion when
+        #      patching multiple classes in the same hierarchy.
+        for name, factory in PATCH_STORAGE.items():
+            if name not in cls.__dict__:
+                setattr(cls, name, PatchStorage(name, factory, cls))
+        _patched_classes.add(cls)
 
     def wrapper(patch_class: type) -> type:
-        # Keep a reference to the patch class
-        cls.__patches__.append(patch_class)
-        # Inject members of the patch class into the original class
-        for member_name, member in get_members(patch_class).items():
-            if member_name in SKIPPED_MEMBERS:
-                continue
-            patch_member(cls, member_name, member)
+        # Defer patching until the batch of the current thread is applied
+        if (batch := getattr(_local, "batch", None)) is not None:
+            batch.setdefault(cls, []).append(patch_class)
+        else:
+            _apply_patches(cls, [patch_class])
         return patch_class
 
     return wrapper
 
 
-def _create_subclass_patch_reset(orig_init_subclass: Callable) -> Callable:
-    """Create an __init_subclass__ method that resets patch tracking for subclasses."""
+@contextmanager
+def batch_patches(configure: bool = True) -> Iterator[None]:
+    """Context manager to apply all the patches decorated within it at once.
+
+    Patch classes are collected per original class and applied in the order they were
+    decorated when the context exits. Nothing is applied if an exception is raised.
+
+    :param configure: Whether to configure SQLAlchemy mappers once all patches are applied.
+    """
+    # Patches in nested batches are applied with the outermost one
+    if getattr(_local, "batch", None) is not None:
+        yield
+        return
+    batch: dict[PatchedClass, list[type]] = {}
+    _local.batch = batch
+    try:
+        yield
+    finally:
+        _local.batch = None
+    # Index super() resolution once per patched member instead of once per patch
+    with patch_lock, deferred_indexing():
+        for cls, patch_classes in batch.items():
+            _apply_patches(cls, patch_classes)
+    if configure and any(hasattr(cls, "__mapper__") for cls in batch):
+        configure_mappers()
+
+
+def compile_patches(orig_class: type) -> None:
+    """Bind calls to super() in the patched members of a class to the members they override.
+
+    Calls to ``super().member`` from the patched versions of a member become as cheap as
+    regular attribute lookups, no matter how many times the member was patched. Meant to be
+    called once all patches of the class are applied, although later patches are still safe.
+
+    :param orig_class: The class whose patches to compile.
+    """
+    if not isinstance(orig_class, type) or "__unpatched__" not in orig_class.__dict__:
+        raise TypeError("Cannot compile patches of classes that were not patched")
+    with patch_lock:
+        ensure_unfrozen()
+        compile_super_calls(cast(PatchedClass, orig_class))
+
+
+def unpatch(orig_class: type) -> None:
+    """Revert all the patches applied to a class, restoring its original members.
+
+    Members added by patches are deleted, except for the attributes managed by SQLAlchemy
+    mappers (e.g. columns), which cannot be removed from their mapper.
+
+    :param orig_class: The class whose patches to revert.
+    """
+    if not isinstance(orig_class, type) or "__unpatched__" not in orig_class.__dict__:
+        raise TypeError("Cannot unpatch classes that were not patched")
+    ensure_unfrozen()
+    _revert_patches(cast(PatchedClass, orig_class), None)
+
+
+@contextmanager
+def patched() -> Iterator[None]:
+    """Context manager to revert all the patches applied to classes within it on exit.
+
+    Classes are restored to their state before the context, so patches applied before it
+    are kept. Contexts can be nested, each reverting the patches applied within it.
+    """
+    recorder: dict[PatchedClass, PatchSnapshot | None] = {}
+    with patch_lock:
+        _recorders.append(recorder)
+    try:
+        yield
+    finally:
+        with patch_lock:
+            _recorders.remove(recorder)
+            # Revert the latest patched classes first in case they are subclasses of earlier ones
+            for cls, snapshot in reversed(recorder.items()):
+                if "__unpatched__" in cls.__dict__:
+                    _revert_patches(cls, snapshot)
+
+
+def freeze_classes(compile_super: bool) -> None:
+    """Freeze the bookkeeping of all patched classes.
+
+    :param compile_super: Whether to compile calls to super() in the patched members.
+    """
+    with patch_lock:
+        for cls in list(_patched_classes):
+            # Classes may have been unpatched since
+            if "__unpatched__" not in cls.__dict__:
+                continue
+            if compile_super:
+                compile_super_calls(cls)
+            cls.__unpatched__.freeze()
+            # Replace the rest of the storage with read-only versions
+            cls.__dict__["__patches__"].value = tuple(cls.__patches__)
+            cls.__dict__["__resolution__"].value = MappingProxyType(cls.__resolution__)
+
+
+def _take_snapshot(cls: PatchedClass) -> PatchSnapshot | None:
+    """Take a snapshot of the patches of a class, or None if it was never patched."""
+    if "__unpatched__" not in cls.__dict__:
+        return None
+    return len(cls.__patches__), {(category, name): len(versions)
+                                  for category, name, versions in cls.__unpatched__.members()}
+
+
+def _revert_patches(cls: PatchedClass, snapshot: PatchSnapshot | None) -> None:
+    """Revert the patches applied to a class since a snapshot was taken.
+
+    :param cls: The class whose patches to revert.
+    :param snapshot: The snapshot to restore, or None to revert all patches.
+    """
+    with patch_lock:
+        ensure_unfrozen()
+        patches, counts = snapshot or (0, {})
+        revert_members(cls, counts)
+        metrics.forget(cls, cls.__patches__[patches:])
+        del cls.__patches__[patches:]
+        # Cached class properties are computed again for the reverted class
+        CachedClassProperty.forget(cls)
+        # Classes that were never patched do not keep any patch tracking storage
+        if snapshot is None:
+            for name in PATCH_STORAGE:
+                delattr(cls, name)
+
+
+def _apply_patches(cls: PatchedClass, patch_classes: list[type]) -> None:
+    """Inject the members of patch classes into an original class in order.
+
+    :param cls: The class to patch.
+    :param patch_classes: The patch classes to apply.
+    """
+    # Patches are applied one class at a time under the lock, so that patching threads never
+    # interleave and shared indexes are updated consistently. Readers don't take the lock and see
+    # each member as soon as it is set, so how super() resolves for a member is published first
+    with patch_lock:
+        ensure_unfrozen()
+        for patch_class in patch_classes:
+            # Keep a reference to the patch class
+            cls.__patches__.append(patch_class)
+            # Inject members of the patch class into the original class
+            for member_name, member in get_members(patch_class).items():
+                if member_name in SKIPPED_MEMBERS:
+                    continue
+                patch_member(cls, member_name, member)
+        # Values of cached class properties may depend on any patched member
+        CachedClassProperty.forget(cls)
+
+
+class PatchStorage:
+    """Class attribute holding the patch tracking storage of a class.
+
+    Subclasses of patched classes get their own empty storage the first time they
+    access it, so that creating subclasses costs nothing no matter how many times the
+    parent class was patched. Once patches are frozen, subclasses get empty storage
+    that is not kept in them.
+
+    :param name: The name of the attribute
+    :param factory: The callable creating empty storage for a class
+    :param owner: The class the storage belongs to
+    """
+
+    __slots__ = ("factory", "name", "owner", "value")
 
-    def __init_subclass__(subcls: PatchedClass, **kwargs: Any) -> None:
-        orig_init_subclass(**kwargs)
-        # Reset patch tracking for subclass
-        subcls.__patches__ = []
-        subcls.__unpatched__ = defaultdict(lambda: defaultdict(list))
+    def __init__(self, name: str, factory: Callable[[type], Any], owner: type) -> None:
+        self.name = name
+        self.factory = factory
+        self.owner = owner
+        self.value = factory(owner)
 
-    return __init_subclass__
+    def __get__(self, instance: object | None, owner: type) -> Any:
+        """Return the storage of a class, creating it for subclasses on first access."""
+        if owner is self.owner:
+            return self.value
+        # Subclasses can no longer be patched, so their storage is never filled
+        if is_frozen():
+            return self.factory(owner)
+        with patch_lock:
+            # Another thread may have created the storage of the subclass in the meantime
+            if isinstance(storage := owner.__dict__.get(self.name), PatchStorage) and storage.owner is owner:
+                return storage.value
+            storage = PatchStorage(self.name, self.factory, owner)
+            setattr(owner, self.name, storage)
+            return storage.value
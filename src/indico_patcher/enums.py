@@ -1,21 +1,208 @@
 # This file is part of indico-patcher.
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
+from __future__ import annotations
+
+import operator
+import weakref
+from bisect import bisect_left
+from collections.abc import Callable
+from collections.abc import Hashable
 from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
 from enum import Enum
 from enum import EnumMeta
+from enum import Flag
+from enum import property as enum_property
+from functools import wraps
+from typing import Any
+from typing import Concatenate
+from typing import Literal
+from typing import NamedTuple
+from typing import SupportsIndex
 from typing import cast
+from typing import overload
 
 from aenum import extend_enum
 
 from indico.util.enum import RichIntEnum
 
+from .freezing import ensure_unfrozen
 from .types import EnumWrapper
+from .util import patch_lock
 
-__all__ = ["patch_enum"]
+__all__ = ["Reservation", "RichValues", "cache_by_generation", "get_generation", "get_reservations", "patch_enum"]
 
 # Attributes used to store data for rich properties in RichEnum
 RICH_ENUM_BASE_ATTRS = ("__titles__", "__css_classess__")
+# Step between paddings allocated automatically to avoid reserved values
+AUTO_PADDING_STEP = 1000
+
+# Registry of values reserved in patched enums, per enum
+_reservations: weakref.WeakKeyDictionary[EnumMeta, _Reservations] = weakref.WeakKeyDictionary()
+# Number of patches applied to patched enums, per enum
+_generations: weakref.WeakKeyDictionary[EnumMeta, int] = weakref.WeakKeyDictionary()
+
+
+class Reservation(NamedTuple):
+    """Range of values reserved in an Enum, from start up to but not including stop."""
+
+    start: int
+    stop: int
+    owner: str
+
+
+class _Reservations:
+    """Registry of non-overlapping ranges of values reserved in an Enum."""
+
+    __slots__ = ("_reservations", "_starts")
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._reservations: list[Reservation] = []
+
+    def __iter__(self) -> Iterator[Reservation]:
+        """Iterate over the reservations, sorted by their start."""
+        return iter(self._reservations)
+
+    def find_overlap(self, start: int, stop: int) -> Reservation | None:
+        """Find a reservation overlapping a range of values.
+
+        :param start: The first value of the range
+        :param stop: The value after the last value of the range
+        """
+        # Since ranges don't overlap, only the last range starting within the given one can
+        # overlap it, as it would be overlapped by any previous one otherwise
+        idx = bisect_left(self._starts, stop)
+        if idx and self._reservations[idx - 1].stop > start:
+            return self._reservations[idx - 1]
+        return None
+
+    def get_owner(self, value: int) -> str | None:
+        """Get the owner of the reservation of a value, if any.
+
+        :param value: The value to get the owner of
+        """
+        reservation = self.find_overlap(value, value + 1)
+        return reservation.owner if reservation else None
+
+    def allocate(self, start: int, stop: int) -> int:
+        """Find the lowest padding for a range of values that avoids all reservations.
+
+        :param start: The first value of the range
+        :param stop: The value after the last value of the range
+        """
+        padding = 0
+        while reservation := self.find_overlap(start + padding, stop + padding):
+            # Skip to the first multiple of the step past the overlapping reservation
+            padding = -(-(reservation.stop - start) // AUTO_PADDING_STEP) * AUTO_PADDING_STEP
+        return padding
+
+    def add(self, reservation: Reservation) -> None:
+        """Reserve a range of values.
+
+        :param reservation: The range of values to reserve
+        """
+        idx = bisect_left(self._starts, reservation.start)
+        self._starts.insert(idx, reservation.start)
+        self._reservations.insert(idx, reservation)
+
+
+class RichValues(Sequence[Any]):
+    """List-like sequence of per-member rich values of a RichIntEnum.
+
+    Values of the original enum are stored in a list, while values of patches are
+    stored by index so that padding between them takes no memory. Indexes in the
+    padding hold None, as in the original padded lists.
+
+    :param values: The initial values of the sequence
+    """
+
+    __slots__ = ("_dense", "_length", "_sparse")
+
+    def __init__(self, values: Iterable[Any] = ()) -> None:
+        if isinstance(values, RichValues):
+            self._dense: list[Any] = values._dense
+            self._sparse: dict[int, Any] = values._sparse
+            self._length: int = values._length
+        else:
+            self._dense = list(values)
+            self._sparse = {}
+            self._length = len(self._dense)
+
+    def extended(self, offset: int, values: Iterable[Any]) -> RichValues:
+        """Return a new sequence with values placed from an offset on.
+
+        :param offset: The index of the first value, not lower than the length of the sequence
+        :param values: The values to place
+        """
+        if offset < self._length:
+            raise ValueError("Values cannot be placed before the end of the sequence.")
+        extended = RichValues()
+        values = list(values)
+        # Keep values contiguous to the original ones in the list
+        if offset == self._length and not self._sparse:
+            extended._dense = self._dense + values
+        else:
+            extended._dense = self._dense
+            extended._sparse = {**self._sparse,
+                                **{offset + idx: value for idx, value in enumerate(values) if value is not None}}
+        extended._length = offset + len(values)
+        return extended
+
+    @overload
+    def __getitem__(self, index: SupportsIndex) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Any]: ...
+
+    def __getitem__(self, index: SupportsIndex | slice) -> Any:
+        """Get the value at an index, or a list of values in a slice."""
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(self._length))]
+        idx = operator.index(index)
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("Rich value index out of range.")
+        if idx < len(self._dense):
+            return self._dense[idx]
+        return self._sparse.get(idx)
+
+    def __len__(self) -> int:
+        """Return the length of the sequence, including padding."""
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the values of the sequence, including padding."""
+        yield from self._dense
+        for idx in range(len(self._dense), self._length):
+            yield self._sparse.get(idx)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the values of the sequence with another sequence."""
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __add__(self, other: Iterable[Any]) -> RichValues:
+        """Return a new sequence with values appended."""
+        return self.extended(self._length, other)
+
+    def __radd__(self, other: Iterable[Any]) -> RichValues:
+        """Return a new sequence with values prepended, e.g. when added to a list."""
+        values = list(other)
+        prepended = RichValues(values + self._dense)
+        prepended._sparse = {len(values) + idx: value for idx, value in self._sparse.items()}
+        prepended._length = len(values) + self._length
+        return prepended
+
+    def __repr__(self) -> str:
+        """Return a representation of the sequence with the values it stores."""
+        return f"RichValues({self._dense!r}, {self._sparse!r}, length={self._length})"
 
 
 # TODO: Modify RichIntEnum upstream so that it's possible to programmatically
@@ -23,14 +210,20 @@ RICH_ENUM_BASE_ATTRS = ("__titles__", "__css_classess__")
 #       avoid having to explicitly specify additional ones in the decorator.
 def patch_enum(
     enum: EnumMeta, *,
-    padding: int = 0,
+    padding: int | Literal["auto"] = 0,
     extra_attrs: tuple[str, ...] = (),
     rich_attrs: tuple[str, ...] = ()
 ) -> EnumWrapper:
     """Patch an Enum with members and attributes from a decorated one.
 
+    The range of new values of the patched members is reserved in the original enum,
+    so that patches with overlapping ranges are rejected before any member is added.
+    Patched members with the value of a member of the original enum become aliases of it.
+
     :param padding: Value padding for patched enum members. Useful to avoid
-                    collisions with future members in the original enum.
+                    collisions with future members in the original enum. If "auto",
+                    the lowest multiple of `AUTO_PADDING_STEP` that avoids collisions
+                    with reserved values is used.
     :param extra_args: Additional attributes that should be carried over to the
                        original enum.
     :param rich_attrs: Additional attributes used for per-member rich information
@@ -38,8 +231,9 @@ def patch_enum(
     """
     if not isinstance(enum, EnumMeta):
         raise TypeError("The 'enum' argument must be a subclass of Enum.")
-    if padding < 0:
+    if padding != "auto" and padding < 0:
         raise ValueError("Padding value cannot be negative.")
+    ensure_unfrozen()
 
     # Determine which rich attributes need to be patched
     _rich_attrs: set[str] = set()
@@ -55,29 +249,198 @@ def patch_enum(
     def wrapper(patch: EnumMeta) -> None:
         if not isinstance(patch, EnumMeta):
             raise TypeError("The patch must be a subclass of Enum.")
-        # Extend original enum with members from patch
-        for x in cast(Iterable[Enum], patch):
-            extend_enum(enum, x.name, x.value + padding)
-        # Extend original enum with per-member rich values
-        for attr in _rich_attrs:
-            _patch_rich_attr(patch, attr)
-        # Set extra attributes in the original enum
-        for attr in extra_attrs:
-            value = getattr(patch, attr)
-            setattr(enum, attr, value)
-
-    def _patch_rich_attr(patch: EnumMeta, attr: str) -> None:
+        # Reserve values and extend the enum atomically in case enums are patched from several threads
+        with patch_lock:
+            ensure_unfrozen()
+            members = [(x.name, x.value) for x in cast(Iterable[Enum], patch)]
+            # Check the range of new values of the patch against the values reserved in one go
+            reservations = _get_reservations(enum)
+            values = [value for _, value in members]
+            start, stop = (min(values), max(values) + 1) if values else (0, 0)
+            _padding = reservations.allocate(start, stop) if padding == "auto" else padding
+            # Values of members of the original enum are aliased instead of reserved again, while
+            # values reserved by other patches still collide
+            owner = _get_owner(enum)
+            if values := [value + _padding for value in values if reservations.get_owner(value + _padding) != owner]:
+                start, stop = min(values), max(values) + 1
+                if reservation := reservations.find_overlap(start, stop):
+                    raise ValueError(f"Values {start}-{stop - 1} of {_get_owner(patch)!r} collide with values "
+                                     f"{reservation.start}-{reservation.stop - 1} reserved by {reservation.owner!r}.")
+            # Extend original enum with members from patch
+            _extend_enum(enum, [(name, value + _padding) for name, value in members])
+            if values:
+                reservations.add(Reservation(start, stop, _get_owner(patch)))
+            # Extend original enum with per-member rich values
+            for attr in _rich_attrs:
+                _patch_rich_attr(patch, attr, _padding)
+            # Set extra attributes in the original enum
+            for attr in extra_attrs:
+                value = getattr(patch, attr)
+                setattr(enum, attr, value)
+            # Invalidate data derived from the enum before the patch
+            _generations[enum] = _generations.get(enum, 0) + 1
+
+    def _patch_rich_attr(patch: EnumMeta, attr: str, padding: int) -> None:
         """Patch the rich attribute af a RichIntEnum."""
         if not all(hasattr(x, attr) for x in (enum, patch)):
             return
         orig_rich_values = getattr(enum, attr)
         patch_rich_values = getattr(patch, attr)
-        # Determine padding for list of rich values
-        padding_values = []
-        if padding:
-            idx = padding - len(orig_rich_values)
-            padding_values = [None] * idx
-        # Set the new list of rich values in the original enum
-        setattr(enum, attr, orig_rich_values + padding_values + patch_rich_values)
+        # Rich values of the patch start at the padded value of its members
+        offset = max(padding, len(orig_rich_values))
+        # Set the new sequence of rich values in the original enum
+        setattr(enum, attr, RichValues(orig_rich_values).extended(offset, patch_rich_values))
 
     return wrapper
+
+
+def get_generation(enum: EnumMeta) -> int:
+    """Get the number of patches applied to an Enum.
+
+    :param enum: The Enum to get the generation of
+    """
+    return _generations.get(enum, 0)
+
+
+def cache_by_generation[**P, T](func: Callable[Concatenate[EnumMeta, P], T]) -> Callable[Concatenate[EnumMeta, P], T]:
+    """Decorator to cache data derived from an Enum until the Enum is patched again.
+
+    The decorated function takes the Enum as its first argument, followed by any
+    hashable arguments. Results are cached per Enum and arguments, and recomputed
+    once a new patch is applied to the Enum.
+
+    .. code-block:: python
+
+        @cache_by_generation
+        def get_choices(enum):
+            return sorted((x.value, x.title) for x in enum)
+    """
+    cache: weakref.WeakKeyDictionary[EnumMeta, tuple[int, dict[Hashable, T]]] = weakref.WeakKeyDictionary()
+
+    @wraps(func)
+    def wrapper(enum: EnumMeta, *args: P.args, **kwargs: P.kwargs) -> T:
+        generation = _generations.get(enum, 0)
+        cached_generation, results = cache.get(enum, (-1, {}))
+        if cached_generation != generation:
+            results = {}
+            cache[enum] = (generation, results)
+        key = (args, tuple(kwargs.items())) if kwargs else args
+        try:
+            return results[key]
+        except KeyError:
+            result = results[key] = func(enum, *args, **kwargs)
+            return result
+
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+def get_reservations(enum: EnumMeta) -> list[Reservation]:
+    """Get the ranges of values reserved in an Enum, sorted by their start.
+
+    :param enum: The Enum to get the reserved values of
+    """
+    return list(_get_reservations(enum))
+
+
+def _get_reservations(enum: EnumMeta) -> _Reservations:
+    """Get the registry of values reserved in an Enum.
+
+    Values of the members defined in the original enum are reserved by the enum itself,
+    one range per run of consecutive values so that values between them remain free.
+
+    :param enum: The Enum to get the registry of
+    """
+    try:
+        return _reservations[enum]
+    except KeyError:
+        reservations = _reservations[enum] = _Reservations()
+        owner = _get_owner(enum)
+        values = sorted({value for value in enum._value2member_map_ if isinstance(value, int)})
+        for idx, value in enumerate(values):
+            if not idx or values[idx - 1] != value - 1:
+                start = value
+            if idx == len(values) - 1 or values[idx + 1] != value + 1:
+                reservations.add(Reservation(start, value + 1, owner))
+        return reservations
+
+
+def _get_owner(enum: EnumMeta) -> str:
+    """Return the fully qualified name of an Enum reserving values."""
+    return f"{enum.__module__}.{enum.__qualname__}"
+
+
+def _extend_enum(enum: EnumMeta, members: list[tuple[str, Any]]) -> None:
+    """Extend an Enum with new members at once.
+
+    Extending an Enum one member at a time rebuilds its lookup structures and checks
+    for aliases among all existing members on every call. Instead, all new members
+    are validated and created first and then added to the Enum in a single pass.
+
+    :param enum: The Enum to extend
+    :param members: The names and values of the new members
+    """
+    if not _supports_bulk_extension(enum, members):
+        for name, value in members:
+            extend_enum(enum, name, value)
+        return
+    # Validate all names before modifying the enum
+    names: set[str] = set()
+    for name, _ in members:
+        if name in enum.__dict__ or name in enum._member_map_ or name in names:
+            raise TypeError(f"{name!r} already in use in {enum.__name__!r}.")
+        names.add(name)
+    # Create the new members before modifying the enum, aliasing members with duplicate values
+    value_map = dict(enum._value2member_map_)
+    new_members: list[Enum] = []
+    for name, value in members:
+        if (member := value_map.get(value)) is None:
+            member = value_map[value] = _create_member(enum, name, value, len(enum._member_names_) + len(new_members))
+            new_members.append(member)
+        redirect = enum_property()
+        redirect.__set_name__(cast(type[Enum], enum), name)
+        redirect.member = member
+        setattr(enum, name, redirect)
+        enum._member_map_[name] = member
+    # Only canonical members are listed in the enum
+    enum._member_names_.extend(member._name_ for member in new_members)
+    enum._value2member_map_.update((member._value_, member) for member in new_members)
+
+
+def _supports_bulk_extension(enum: EnumMeta, members: list[tuple[str, Any]]) -> bool:
+    """Check whether an Enum can be extended with new members at once.
+
+    Flags and enums created by aenum keep additional bookkeeping per member. Member
+    names shadowing descriptors of parent classes and unhashable values also need
+    to be handled individually.
+
+    :param enum: The Enum to extend
+    :param members: The names and values of the new members
+    """
+    if issubclass(enum, Flag) or hasattr(enum, "_settings_"):
+        return False
+    parent_attrs = {attr for base in enum.__mro__[1:] for attr in base.__dict__}
+    return all(name not in parent_attrs and isinstance(value, Hashable) for name, value in members)
+
+
+def _create_member(enum: EnumMeta, name: str, value: Any, sort_order: int) -> Enum:
+    """Create a member of an Enum the same way as the members defined in its body.
+
+    :param enum: The Enum the member belongs to
+    :param name: The name of the member
+    :param value: The value of the member
+    :param sort_order: The position of the member in the Enum
+    """
+    # XXX: Internal attributes of enums are not part of their type annotations
+    enum_class = cast(Any, enum)
+    args = value if isinstance(value, tuple) else (value,)
+    if enum_class._member_type_ is tuple:
+        args = (args,)
+    member = enum_class._new_member_(enum, *args) if enum_class._use_args_ else enum_class._new_member_(enum)
+    if not hasattr(member, "_value_"):
+        member._value_ = value if enum_class._member_type_ is object else enum_class._member_type_(*args)
+    member._name_ = name
+    member.__objclass__ = enum
+    member.__init__(*args)
+    member._sort_order_ = sort_order
+    return member
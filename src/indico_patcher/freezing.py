@@ -0,0 +1,48 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from __future__ import annotations
+
+__all__ = ["freeze", "is_frozen"]
+
+# Whether patches are frozen and can no longer be applied or reverted
+_frozen = False
+
+
+def freeze(compile_super: bool = True) -> None:
+    """Freeze the bookkeeping of all patches once they are applied.
+
+    Meant to be called at the end of startup in pre-fork servers, before `gc.freeze()` and
+    forking the workers. The stored members, patch classes and super() resolution of every
+    patched class become read-only, and no further patches can be applied or reverted, so
+    that the bookkeeping is only read and stays in pages shared with the workers. Caches
+    filled on first use (e.g. the values of cached class properties) are still written by
+    each worker.
+
+    :param compile_super: Whether to compile calls to super() in all patched classes as with
+                          `compile_patches()`, so that they are resolved once and for all.
+    """
+    global _frozen
+    # XXX: Imported here since patching code depends on this module to refuse patches once frozen
+    from .classes import freeze_classes
+    from .lazy import get_pending_modules
+    from .util import patch_lock
+    with patch_lock:
+        if _frozen:
+            return
+        # Patches waiting for their module would be refused when it is imported
+        if pending := get_pending_modules():
+            raise RuntimeError(f"Cannot freeze patches while patches of modules are pending: {', '.join(pending)}")
+        freeze_classes(compile_super)
+        _frozen = True
+
+
+def is_frozen() -> bool:
+    """Check whether patches are frozen."""
+    return _frozen
+
+
+def ensure_unfrozen() -> None:
+    """Refuse to change patches once they are frozen."""
+    if _frozen:
+        raise RuntimeError("Cannot change patches once they are frozen")
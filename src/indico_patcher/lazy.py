@@ -0,0 +1,163 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable
+from collections.abc import Sequence
+from importlib.abc import Loader
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from typing import Any
+from typing import cast
+
+from .freezing import ensure_unfrozen
+from .types import ClassWrapper
+from .util import patch_lock
+
+__all__ = ["patch_lazy"]
+
+# Patches waiting for their target module to be imported, per module name
+_pending: dict[str, list[tuple[str, Callable[[Any], Callable[[Any], Any]], type]]] = {}
+
+
+class PatchFinder(MetaPathFinder):
+    """Import hook that applies pending patches once their target module is imported."""
+
+    def find_spec(self, fullname: str, path: Sequence[str] | None,
+                  target: ModuleType | None = None) -> ModuleSpec | None:
+        if fullname not in _pending:
+            return None
+        # Let the rest of finders find the module
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            if (spec := finder.find_spec(fullname, path, target)) is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None:
+            spec.loader = PatchLoader(spec.loader)
+        return spec
+
+
+class PatchLoader(Loader):
+    """Loader that applies pending patches after executing a module."""
+
+    def __init__(self, loader: Loader) -> None:
+        self.loader = loader
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else (e.g. `get_source`) to the original loader."""
+        return getattr(self.loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        self.loader.exec_module(module)
+        # Hide the loader once the module is imported
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        _apply_pending(module)
+
+
+class _InitializingSpec:
+    """Mixin for the spec of a module being initialized to apply pending patches once it is.
+
+    Only used for modules that were not loaded through the import hook, e.g. when patches
+    are registered from a module imported by their target module before any other patch
+    of it was pending.
+    """
+
+    _spec_class: type[ModuleSpec]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name != "_initializing" or value:
+            return
+        # Restore the original class of the spec once the module is initialized
+        spec = cast(ModuleSpec, self)
+        spec.__class__ = self._spec_class
+        # Keep the patches pending if the module failed to be imported
+        if (module := sys.modules.get(spec.name)) is not None and module.__spec__ is spec:
+            _apply_pending(module)
+
+
+# Import hook shared by all lazy patches
+_finder = PatchFinder()
+
+
+def patch_lazy(target: str, patcher: Callable[[Any], Callable[[Any], Any]]) -> ClassWrapper:
+    """Decorator to patch a class or enum by import path once its module is imported.
+
+    :param target: The import path of the class or enum to patch (e.g. ``package.module:Class``).
+    :param patcher: The function returning the wrapper to patch the class or enum with.
+    :return: A wrapper that takes the patch class.
+    """
+    module_name, _, attr_path = target.partition(":")
+    if not module_name or not attr_path:
+        raise ValueError(f"Invalid import path '{target}', expected 'package.module:Class'")
+
+    def wrapper(patch_class: type) -> type:
+        # Register the patch atomically in case modules are imported from several threads
+        with patch_lock:
+            # Refuse patches that would only be applied after freezing once their module is imported
+            ensure_unfrozen()
+            # Patch right away if the module was already imported
+            module = sys.modules.get(module_name)
+            spec: ModuleSpec | None = getattr(module, "__spec__", None)
+            if module and not getattr(spec, "_initializing", False):
+                patcher(_get_target(module, attr_path))(patch_class)
+                return patch_class
+            _pending.setdefault(module_name, []).append((attr_path, patcher, patch_class))
+            # Patch modules being initialized (e.g. on circular imports) once they are, which the
+            # import hook already does for the modules it loads
+            if spec is not None and not isinstance(spec.loader, PatchLoader):
+                _defer_until_initialized(spec)
+            if _finder not in sys.meta_path:
+                sys.meta_path.insert(0, _finder)
+            return patch_class
+
+    return wrapper
+
+
+def _defer_until_initialized(spec: ModuleSpec) -> None:
+    """Apply the pending patches of a module being initialized once it is.
+
+    :param spec: The spec of the module being initialized
+    """
+    # XXX: The import machinery flags the specs of modules being executed with the private
+    #      `_initializing` attribute and resets it once they are executed, which is caught by
+    #      replacing the class of the spec. This relies on `importlib._bootstrap._load_unlocked`
+    #      and was checked against CPython 3.12 and 3.13.
+    if isinstance(spec, _InitializingSpec):
+        return
+    spec_class = type(spec)
+    spec.__class__ = type(spec_class.__name__, (_InitializingSpec, spec_class), {"_spec_class": spec_class})
+
+
+def get_pending_modules() -> list[str]:
+    """Get the names of the modules with patches waiting for them to be imported."""
+    return list(_pending)
+
+
+def _apply_pending(module: ModuleType) -> None:
+    """Apply the pending patches of a module in the order they were registered."""
+    with patch_lock:
+        for attr_path, patcher, patch_class in _pending.pop(module.__name__, []):
+            patcher(_get_target(module, attr_path))(patch_class)
+        # Remove the import hook once there are no more pending patches
+        if not _pending and _finder in sys.meta_path:
+            sys.meta_path.remove(_finder)
+
+
+def _get_target(module: ModuleType, attr_path: str) -> Any:
+    """Get the object at a dotted attribute path of a module."""
+    target: Any = module
+    for attr in attr_path.split("."):
+        target = getattr(target, attr)
+    return target
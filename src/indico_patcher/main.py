@@ -8,11 +8,18 @@ from typing import Any
 
 from .classes import patch_class
 from .enums import patch_enum
+from .lazy import patch_lazy
 from .types import PatchWrapper
 
 
-def patch(target: type | EnumMeta, *args: Any, **kwargs: Any) -> PatchWrapper:
-    """Patch a given class or enum."""
+def patch(target: type | EnumMeta | str, *args: Any, **kwargs: Any) -> PatchWrapper:
+    """Patch a given class or enum.
+
+    The target can also be given by import path (e.g. ``package.module:Class``), in which case
+    it is patched once its module is imported.
+    """
+    if isinstance(target, str):
+        return patch_lazy(target, lambda obj: patch(obj, *args, **kwargs))
     if isinstance(target, EnumMeta):
         return patch_enum(target, *args, **kwargs)
     else:
@@ -0,0 +1,177 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from __future__ import annotations
+
+import os
+import weakref
+from collections.abc import Callable
+from collections.abc import Collection
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+__all__ = ["MemberStats", "disable", "enable", "is_enabled", "reset", "snapshot", "write_prometheus"]
+
+# Upper bounds in seconds of the buckets for the latency of calls to patched members
+BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+# Whether members patched from now on are instrumented
+_enabled = False
+# Metrics of instrumented members, per original class and (member name, patch class)
+_metrics: weakref.WeakKeyDictionary[type, dict[tuple[str, type | None], _MemberMetrics]] = \
+    weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class MemberStats:
+    """Snapshot of the calls to a patched member."""
+
+    orig_class: type
+    member_name: str
+    patch_class: type | None
+    count: int
+    total: float
+    buckets: tuple[int, ...]
+
+
+class _MemberMetrics:
+    """Mutable call count and latency of a patched member."""
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded calls."""
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def record(self, elapsed: float) -> None:
+        """Record a call to the member.
+
+        :param elapsed: The time spent in the call in seconds
+        """
+        self.count += 1
+        self.total += elapsed
+        for idx, bound in enumerate(BUCKETS):
+            if elapsed <= bound:
+                self.buckets[idx] += 1
+                break
+
+
+def enable() -> None:
+    """Instrument members patched from now on to record their calls."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop instrumenting members patched from now on.
+
+    Members that were already instrumented keep recording their calls.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Check whether members patched from now on are instrumented."""
+    return _enabled
+
+
+def reset() -> None:
+    """Reset the recorded calls of all instrumented members."""
+    for members in _metrics.values():
+        for metrics in members.values():
+            metrics.reset()
+
+
+def snapshot() -> list[MemberStats]:
+    """Take a snapshot of the recorded calls of all instrumented members."""
+    # Histogram buckets are cumulative, as in Prometheus
+    return [
+        MemberStats(orig_class, member_name, patch_class, metrics.count, metrics.total,
+                    tuple(sum(metrics.buckets[:idx + 1]) for idx in range(len(BUCKETS))))
+        for orig_class, members in list(_metrics.items())
+        for (member_name, patch_class), metrics in members.items()
+    ]
+
+
+def write_prometheus(path: str | os.PathLike[str]) -> None:
+    """Write a snapshot of the recorded calls in the Prometheus text exposition format.
+
+    The file is replaced atomically so that it can be read by the textfile collector
+    of the Prometheus node exporter at any time.
+
+    :param path: The path of the file to write
+    """
+    lines = [
+        "# HELP indico_patcher_call_duration_seconds Latency of calls to patched members.",
+        "# TYPE indico_patcher_call_duration_seconds histogram",
+    ]
+    for stats in snapshot():
+        labels = (f'class="{_escape(_qualname(stats.orig_class))}",member="{_escape(stats.member_name)}",'
+                  f'patch="{_escape(_qualname(stats.patch_class))}"')
+        for bound, count in zip(BUCKETS, stats.buckets, strict=True):
+            lines.append(f'indico_patcher_call_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'indico_patcher_call_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+        lines.append(f"indico_patcher_call_duration_seconds_sum{{{labels}}} {stats.total}")
+        lines.append(f"indico_patcher_call_duration_seconds_count{{{labels}}} {stats.count}")
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def forget(orig_class: type, patch_classes: Collection[type] | None = None) -> None:
+    """Forget the instrumented members of a class, e.g. after reverting its patches.
+
+    :param orig_class: The class whose members to forget
+    :param patch_classes: The patch classes whose members to forget, or all of them if None
+    """
+    if patch_classes is None:
+        _metrics.pop(orig_class, None)
+        return
+    members = _metrics.get(orig_class, {})
+    for key in [key for key in members if key[1] in patch_classes]:
+        del members[key]
+
+
+def instrument(func: Callable[..., Any], orig_class: type, member_name: str) -> Callable[..., Any]:
+    """Wrap a patched function to record its calls.
+
+    :param func: The patched function to wrap
+    :param orig_class: The class the function is patched in
+    :param member_name: The name of the member the function is patched as
+    """
+    # The patch class being applied is the last one tracked in the original class
+    patches = getattr(orig_class, "__patches__", None)
+    patch_class = patches[-1] if patches else None
+    metrics = _metrics.setdefault(orig_class, {}).setdefault((member_name, patch_class), _MemberMetrics())
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.record(perf_counter() - start)
+
+    # Keep track of the patched function to identify callers of super()
+    wrapper.__instrumented__ = func  # type: ignore[attr-defined]
+    return wrapper
+
+
+def _qualname(cls: type | None) -> str:
+    """Return the fully qualified name of a class."""
+    return f"{cls.__module__}.{cls.__qualname__}" if cls else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value in the Prometheus text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
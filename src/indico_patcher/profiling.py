@@ -0,0 +1,245 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from collections import defaultdict
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from random import random
+from time import perf_counter
+from types import CodeType
+from typing import Any
+
+__all__ = ["ProfileReport", "Profiler"]
+
+# Categories of code the time of profiled calls is split into
+CATEGORIES = ("patch", "original", "super")
+# Identifier of sys.monitoring tool used for profiling
+TOOL_ID = sys.monitoring.PROFILER_ID
+# Events monitored to measure frames, entering and leaving them
+EVENTS = (sys.monitoring.events.PY_START, sys.monitoring.events.PY_RESUME, sys.monitoring.events.PY_RETURN,
+          sys.monitoring.events.PY_YIELD, sys.monitoring.events.PY_THROW, sys.monitoring.events.PY_UNWIND)
+# Events enabled in the code objects of patched and original members
+LOCAL_EVENTS = (sys.monitoring.events.PY_START | sys.monitoring.events.PY_RESUME |
+                sys.monitoring.events.PY_RETURN | sys.monitoring.events.PY_YIELD)
+# Events that cannot be enabled per code object, needed to keep track of frames left on exceptions
+GLOBAL_EVENTS = sys.monitoring.events.PY_THROW | sys.monitoring.events.PY_UNWIND
+
+# Category and member of the code objects of patched and original members
+_codes: weakref.WeakKeyDictionary[CodeType, tuple[str, str]] = weakref.WeakKeyDictionary()
+# The profiler currently monitoring calls, if any
+_active: Profiler | None = None
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """Report of the time spent in patched members.
+
+    Times are only measured for sampled calls, estimates for all calls are given by
+    :meth:`per_request`.
+    """
+
+    requests: int
+    calls: int
+    samples: int
+    times: dict[str, float] = field(default_factory=dict)
+    members: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def per_request(self) -> dict[str, float]:
+        """Estimate the time spent per request in each category of code."""
+        scale = self.calls / self.samples / self.requests if self.samples and self.requests else 0
+        return {category: self.times.get(category, 0) * scale for category in CATEGORIES}
+
+    @property
+    def overhead_per_request(self) -> float:
+        """Estimate the time spent per request in patch code and super() lookups."""
+        per_request = self.per_request()
+        return per_request["patch"] + per_request["super"]
+
+
+class Profiler:
+    """Profiler of the time spent in patched members using sys.monitoring.
+
+    Calls are only monitored in the code objects of patched members, the original members
+    they override and the lookups of super(), so the functions installed in classes are left
+    as is. Frames left by exceptions can only be monitored process-wide though, so raising
+    exceptions is slower in any code while profiling. The time of each sampled call is split
+    into the time spent in patch code, in original code and in super() lookups. Time spent in
+    any other code is attributed to the closest monitored caller.
+
+    Every monitored call goes through the profiler callbacks to keep track of frames and count
+    calls, even if it is not sampled. Sampling only skips reading the clock, so it reduces the
+    overhead of profiling by a fraction rather than in proportion to the sample rate.
+
+    :param sample_rate: The fraction of calls to patched members to measure
+    """
+
+    def __init__(self, sample_rate: float = 1.0) -> None:
+        if not 0 < sample_rate <= 1:
+            raise ValueError("Sample rate must be in the (0, 1] range.")
+        self.sample_rate = sample_rate
+        self._local = threading.local()
+        self._tracked: dict[CodeType, tuple[str, str | None]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all measured calls."""
+        self.requests = 0
+        self.calls = 0
+        self.samples = 0
+        self.times: dict[str, float] = defaultdict(float)
+        self.members: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def start(self) -> None:
+        """Start monitoring calls to patched members."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another profiler is already running.")
+        sys.monitoring.use_tool_id(TOOL_ID, "indico-patcher")
+        _active = self
+        callbacks: tuple[Callable[..., object], ...] = (self._enter, self._enter, self._exit, self._exit,
+                                                        self._throw, self._unwind)
+        for event, callback in zip(EVENTS, callbacks, strict=True):
+            sys.monitoring.register_callback(TOOL_ID, event, callback)
+        for code in _get_super_codes():
+            self.track(code, "super", None)
+        for code, (category, member) in list(_codes.items()):
+            self.track(code, category, member)
+        sys.monitoring.set_events(TOOL_ID, GLOBAL_EVENTS)
+
+    def stop(self) -> None:
+        """Stop monitoring calls to patched members."""
+        global _active
+        if _active is not self:
+            return
+        for code in self._tracked:
+            sys.monitoring.set_local_events(TOOL_ID, code, 0)
+        self._tracked.clear()
+        sys.monitoring.set_events(TOOL_ID, 0)
+        for event in EVENTS:
+            sys.monitoring.register_callback(TOOL_ID, event, None)
+        sys.monitoring.free_tool_id(TOOL_ID)
+        _active = None
+
+    def __enter__(self) -> Profiler:
+        """Start monitoring calls on entering the context."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop monitoring calls on exiting the context."""
+        self.stop()
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Context manager to count the handling of a request."""
+        try:
+            yield
+        finally:
+            self.requests += 1
+
+    def report(self) -> ProfileReport:
+        """Report the time spent in patched members so far."""
+        return ProfileReport(self.requests, self.calls, self.samples, dict(self.times),
+                             {member: dict(times) for member, times in self.members.items()})
+
+    def track(self, code: CodeType, category: str, member: str | None) -> None:
+        """Monitor calls to a code object.
+
+        :param code: The code object to monitor
+        :param category: The category to attribute the time spent in the code object to
+        :param member: The patched member to attribute the time spent in the code object to
+        """
+        self._tracked[code] = (category, member)
+        sys.monitoring.set_local_events(TOOL_ID, code, LOCAL_EVENTS)
+
+    def _get_stack(self) -> list[list[Any]]:
+        """Get the stack of monitored frames of the current thread."""
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def _enter(self, code: CodeType, offset: int) -> None:
+        """Start measuring a monitored frame, pausing the measurement of its caller."""
+        category, member = self._tracked[code]
+        stack = self._get_stack()
+        if stack:
+            caller = stack[-1]
+            sampled = caller[2]
+            # Lookups of super() are attributed to the patched member that calls them
+            member = member or caller[1]
+        else:
+            # Calls are sampled from the outermost monitored frame
+            self.calls += 1
+            sampled = self.sample_rate == 1 or random() < self.sample_rate
+            self.samples += sampled
+        now = perf_counter() if sampled else 0.0
+        if stack and sampled:
+            self._record(stack[-1], now)
+        stack.append([category, member, sampled, now])
+
+    def _exit(self, code: CodeType, offset: int, retval: object) -> None:
+        """Stop measuring a monitored frame, resuming the measurement of its caller."""
+        stack = self._get_stack()
+        if not stack:
+            return
+        frame = stack.pop()
+        if frame[2]:
+            now = perf_counter()
+            self._record(frame, now)
+            if stack:
+                stack[-1][3] = now
+
+    def _throw(self, code: CodeType, offset: int, exc: BaseException) -> None:
+        """Start measuring a monitored generator an exception is thrown into."""
+        if code in self._tracked:
+            self._enter(code, offset)
+
+    def _unwind(self, code: CodeType, offset: int, exc: BaseException) -> None:
+        """Stop measuring a monitored frame left by an exception."""
+        if code in self._tracked:
+            self._exit(code, offset, None)
+
+    def _record(self, frame: list[Any], now: float) -> None:
+        """Attribute the time since a frame was last resumed to its category and member."""
+        category, member, _, since = frame
+        self.times[category] += now - since
+        if member:
+            self.members[member][category] += now - since
+
+
+def register(code: CodeType, category: str, orig_class: type, member_name: str) -> None:
+    """Register the code object of a patched or original member to be profiled.
+
+    :param code: The code object of the member
+    :param category: Whether the code object is from a "patch" or the "original" member
+    :param orig_class: The class the member is patched in
+    :param member_name: The name of the member
+    """
+    # Original members may be patched members of a parent class, which are kept as patches
+    if category == "original" and code in _codes:
+        return
+    member = f"{orig_class.__module__}.{orig_class.__qualname__}.{member_name}"
+    _codes[code] = (category, member)
+    if _active is not None:
+        _active.track(code, category, member)
+
+
+def _get_super_codes() -> list[CodeType]:
+    """Get the code objects used to look up members through super()."""
+    # XXX: Imported here since patching code depends on this module to register code objects
+    from .util import BoundSuperProxy
+    from .util import Duper
+    from .util import SuperProxy
+    from .util import _bind_previous
+    return [func.__code__ for func in (SuperProxy.__call__, BoundSuperProxy.__call__, Duper.__getattribute__,
+                                       Duper.__setattr__, Duper.__delattr__, _bind_previous)]
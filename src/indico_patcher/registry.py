@@ -0,0 +1,168 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+__all__ = ["PatchRegistry"]
+
+# Read-only view returned for categories without any stored member
+_EMPTY: Mapping[str, tuple[Any, ...]] = MappingProxyType({})
+
+
+class PatchRegistry:
+    """Registry of the versions of members overridden by patches in a class.
+
+    Versions are stored per category and member name in tuples, oldest first. Reading
+    never creates entries, so looking up members that were never patched leaves the
+    registry untouched.
+
+    Versions stored for a class are functions and descriptors created while patching,
+    which cannot be pickled. The registry of a class is pickled as the number of stored
+    versions of each member instead, and restored from the registry of the same class.
+
+    :param categories: The versions to start with, per category and member name
+    :param owner: The class whose members are stored in the registry, if any
+    """
+
+    __slots__ = ("_categories", "_frozen", "_owner")
+
+    def __init__(self, categories: Mapping[str, Mapping[str, tuple[Any, ...]]] | None = None, *,
+                 owner: type | None = None) -> None:
+        self._categories: dict[str, dict[str, tuple[Any, ...]]] = {
+            category: {name: tuple(versions) for name, versions in members.items()}
+            for category, members in (categories or {}).items()
+        }
+        self._frozen = False
+        self._owner = owner
+
+    def get(self, category: str, name: str) -> tuple[Any, ...]:
+        """Get the stored versions of a member, oldest first.
+
+        :param category: The category of the member
+        :param name: The name of the member
+        """
+        members = self._categories.get(category)
+        return members.get(name, ()) if members else ()
+
+    def add(self, category: str, name: str, version: Any) -> tuple[Any, ...]:
+        """Store the newest version of a member and return all its stored versions.
+
+        :param category: The category of the member
+        :param name: The name of the member
+        :param version: The version of the member to store
+        """
+        self._ensure_unfrozen()
+        members = self._categories.setdefault(category, {})
+        versions = members[name] = (*members.get(name, ()), version)
+        return versions
+
+    def truncate(self, category: str, name: str, length: int) -> None:
+        """Forget the stored versions of a member newer than a given number of versions.
+
+        :param category: The category of the member
+        :param name: The name of the member
+        :param length: The number of versions to keep, forgetting the member if zero
+        """
+        self._ensure_unfrozen()
+        members = self._categories.get(category)
+        if not members or name not in members:
+            return
+        if length:
+            members[name] = members[name][:length]
+            return
+        del members[name]
+        if not members:
+            del self._categories[category]
+
+    def freeze(self) -> None:
+        """Make the registry immutable."""
+        self._frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the registry is immutable."""
+        return self._frozen
+
+    @property
+    def owner(self) -> type | None:
+        """The class whose members are stored in the registry, if any."""
+        return self._owner
+
+    def members(self) -> list[tuple[str, str, tuple[Any, ...]]]:
+        """Get the category, name and stored versions of every stored member."""
+        return [(category, name, versions)
+                for category, members in self._categories.items()
+                for name, versions in members.items()]
+
+    def names(self, category: str) -> list[str]:
+        """Get the names of the members stored in a category.
+
+        :param category: The category of the members
+        """
+        return list(self._categories.get(category, ()))
+
+    def __getitem__(self, category: str) -> Mapping[str, tuple[Any, ...]]:
+        """Get a read-only view of the members stored in a category."""
+        members = self._categories.get(category)
+        return MappingProxyType(members) if members else _EMPTY
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the categories with stored members."""
+        return iter(self._categories)
+
+    def __len__(self) -> int:
+        """Return the number of categories with stored members."""
+        return len(self._categories)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the stored versions of two registries."""
+        if not isinstance(other, PatchRegistry):
+            return NotImplemented
+        return self._categories == other._categories
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the stored versions per category and member name."""
+        return f"{type(self).__name__}({self._categories!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Reduce the registry to its stored versions, or to their number if it has an owner."""
+        if self._owner is None:
+            return _restore, (None, self._categories, self._frozen)
+        counts = {category: {name: len(versions) for name, versions in members.items()}
+                  for category, members in self._categories.items()}
+        return _restore, (self._owner, counts, self._frozen)
+
+    def _ensure_unfrozen(self) -> None:
+        """Refuse to change the stored versions of a frozen registry."""
+        if self._frozen:
+            raise RuntimeError("Cannot change a frozen patch registry")
+
+
+def _restore(owner: type | None, categories: Mapping[str, Mapping[str, Any]], frozen: bool) -> PatchRegistry:
+    """Restore a pickled registry.
+
+    :param owner: The class whose members are stored in the registry, if any
+    :param categories: The stored versions per category and member name, or their number if
+                       the registry has an owner
+    :param frozen: Whether the registry is immutable
+    """
+    if owner is not None:
+        # The class may have been unpatched in the meantime
+        storage = owner.__dict__.get("__unpatched__")
+        stored: PatchRegistry = storage.value if storage is not None else PatchRegistry()
+        for category, members in categories.items():
+            for name, count in members.items():
+                if len(stored.get(category, name)) < count:
+                    raise ValueError(f"Cannot restore {count} versions of '{name}' in {owner.__qualname__!r}")
+        categories = {category: {name: stored.get(category, name)[:count] for name, count in members.items()}
+                      for category, members in categories.items()}
+    registry = PatchRegistry(categories, owner=owner)
+    registry._frozen = frozen
+    return registry
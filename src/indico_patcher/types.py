@@ -10,6 +10,8 @@ from typing import TypedDict
 
 from sqlalchemy.ext.hybrid import hybrid_property
 
+from .registry import PatchRegistry
+
 # Attribute type aggregates
 propertylike: TypeAlias = property | hybrid_property  # noqa: UP040
 methodlike: TypeAlias = FunctionType | classmethod | staticmethod  # noqa: UP040
@@ -19,10 +21,14 @@ ClassWrapper: TypeAlias = Callable[[type], type]  # noqa: UP040
 EnumWrapper: TypeAlias = Callable[[EnumMeta], None]  # noqa: UP040
 PatchWrapper: TypeAlias = ClassWrapper | EnumWrapper  # noqa: UP040
 
+# Number of patches and stored versions per category and member name of a patched class
+PatchSnapshot: TypeAlias = tuple[int, dict[tuple[str, str], int]]  # noqa: UP040
+
 # Annotations for extra attributes in patched classes
 class PatchedClass(type):
     __patches__: list[type]
-    __unpatched__: dict[str, dict[str, list[Any]]]
+    __unpatched__: PatchRegistry
+    __resolution__: dict[tuple[str, Any], tuple[str, Any] | None]
 
 
 # Dictionary of property descriptor functions
@@ -3,25 +3,76 @@
 
 from __future__ import annotations
 
+import builtins
+import dis
 import sys
+import threading
+import weakref
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import cached_property
 from functools import partial
+from types import CodeType
 from types import FrameType
 from types import FunctionType
 from types import MappingProxyType
 from typing import Any
 from typing import cast
 
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import QueryableAttribute
 
+from indico.util.decorators import cached_classproperty
+from indico.util.decorators import classproperty
+
+from . import metrics
+from . import profiling
 from .types import HybridPropertyDescriptors
 from .types import PatchedClass
 from .types import PropertyDescriptors
 from .types import methodlike
 from .types import propertylike
 
-# TODO: Add `fset` and `fdel` descriptors once SuperProxy supports them
-SUPER_ENABLED_DESCRIPTORS = {"fget"}
+SUPER_ENABLED_DESCRIPTORS = {"fget", "fset", "fdel", "expr"}
 SUPPORTED_DESCRIPTORS = {"fget", "fset", "fdel", "expr"}
+# Categories of unpatched members reachable through super(), in lookup order
+SUPER_CATEGORIES = ("properties", "cached_properties", "hybrid_properties", "classproperties", "cached_classproperties",
+                    "methods", "hybrid_methods", "classmethods", "staticmethods")
+# Categories of unpatched property-like members
+PROPERTY_CATEGORIES = {"properties", "hybrid_properties"}
+# Categories of unpatched class properties from Indico
+CLASSPROPERTY_CATEGORIES = {"classproperties", "cached_classproperties"}
+# Categories of unpatched members with an SQL expression called with the class
+EXPRESSION_CATEGORIES = {"hybrid_properties", "hybrid_methods"}
+# Categories of unpatched members that compiled calls to super() can look up directly
+COMPILED_CATEGORIES = {"properties", "methods", "classmethods", "staticmethods"}
+
+# XXX: Compiling calls to super() relies on the opcodes and inline cache layout of CPython,
+#      which change between versions. It was checked against CPython 3.12 and 3.13, patched
+#      functions keep looking up `super` in their globals on any other interpreter.
+BIND_SUPER_CALLS = sys.implementation.name == "cpython" and (3, 12) <= sys.version_info[:2] <= (3, 13)
+# Opcodes used to compile calls to super() in patched functions
+CACHE = dis.opmap["CACHE"]
+CALL = dis.opmap["CALL"]
+EXTENDED_ARG = dis.opmap["EXTENDED_ARG"]
+LOAD_CONST = dis.opmap["LOAD_CONST"]
+LOAD_DEREF = dis.opmap["LOAD_DEREF"]
+LOAD_FAST_CHECK = dis.opmap["LOAD_FAST_CHECK"]
+LOAD_GLOBAL = dis.opmap["LOAD_GLOBAL"]
+LOAD_SUPER_ATTR = dis.opmap["LOAD_SUPER_ATTR"]
+NOP = dis.opmap["NOP"]
+PUSH_NULL = dis.opmap["PUSH_NULL"]
+# Flag of LOAD_SUPER_ATTR set when super() is called with explicit arguments
+SUPER_ATTR_TWO_ARGS = 0b10
+# Flag of LOAD_GLOBAL set when the global is pushed along with a NULL to be called
+LOAD_GLOBAL_NULL = 0b1
+# Calls expect the NULL below the callable until CPython 3.13 and above it since
+PUSH_NULL_FIRST = sys.version_info < (3, 13)
+
+# Placeholder for members that are not defined in a class
+MISSING = object()
 
 
 class SuperProxy:
@@ -40,46 +91,7 @@ class SuperProxy:
         if patch_class is None:
             patch_class, obj = self._get_defaults()
 
-        class duper:
-            """Interceptor for calls to super().getattr() in the patch class."""
-
-            def __getattribute__(self_, name: str) -> Any:
-                # Get the code object of the caller to identify which member is being accessed in super()
-                current_code = self._get_caller_code()
-
-                # TODO: Find out how to identify which property descriptor method the call is coming from.
-                # XXX: We default to `fget` because calling `super()` on `fset` and `fdel` is broken in Python.
-                #      Bug report: https://bugs.python.org/issue14965
-                if prop := self._get_previous(self.orig_class, "properties", name, current_code):
-                    return prop.fget(obj)
-
-                # TODO: Find out how to identify which property descriptor method the call is coming from.
-                # XXX: We currently default to `fget`.
-                if hprop := self._get_previous(self.orig_class, "hybrid_properties", name, current_code):
-                    return hprop.fget(obj)
-
-                if method := self._get_previous(self.orig_class, "methods", name, current_code):
-                    return partial(method, obj)
-
-                if cmethod := self._get_previous(self.orig_class, "classmethods", name, current_code):
-                    return partial(cmethod.__func__, self.orig_class)
-
-                if smethod := self._get_previous(self.orig_class, "staticmethods", name, current_code):
-                    return smethod
-
-                # Avoid infinite recursion when the member is missing in the original class
-                # (e.g. new member added in patch class)
-                if name in self.orig_class.__unpatched__["missing"]:
-                    raise AttributeError(f"duper object has no attribute '{name}'")
-
-                # Fallback to the original class' member
-                return getattr(obj, name) if obj else getattr(self.orig_class, name)
-
-            def __repr__(self) -> str:
-                classname = f"{patch_class.__module__}.{patch_class.__name__}" if patch_class else None
-                return f"<duper: {classname}, {obj}>"
-
-        return duper()
+        return Duper(self.orig_class, patch_class, obj)
 
     @staticmethod
     def _get_caller_code() -> Any:
@@ -102,7 +114,7 @@ class SuperProxy:
     @staticmethod
     def _get_previous(orig_class: PatchedClass, category: str, name: str, current_code: Any) -> Any:
         """Get the previous version of a member in a class."""
-        stack = orig_class.__unpatched__[category].get(name, [])
+        stack = orig_class.__unpatched__.get(category, name)
         # Check if nothing was stored for this member/category
         if not stack:
             return None
@@ -112,8 +124,7 @@ class SuperProxy:
         # Walk newest to oldest looking for the caller's code object
         for idx in range(len(stack) - 1, -1, -1):
             candidate = stack[idx]
-            code = getattr(_unwrap_callable(candidate), "__code__", None)
-            if code is current_code:
+            if any(code is current_code for code in _get_codes(candidate)):
                 # If the caller is already the first entry, there's no prior version
                 if idx == 0:
                     return None
@@ -122,17 +133,312 @@ class SuperProxy:
         # Fallback to newest stored version if caller not found
         return stack[-1]
 
+    @classmethod
+    def _resolve_previous(cls, orig_class: PatchedClass, name: str, current_code: Any) -> tuple[str, Any] | None:
+        """Resolve the category and previous version of a member as seen from a caller."""
+        for category in SUPER_CATEGORIES:
+            if member := cls._get_previous(orig_class, category, name, current_code):
+                return category, member
+        # Keep track of members that are missing in the original class
+        if orig_class.__unpatched__.get("missing", name):
+            return "missing", None
+        return None
+
+
+class BoundSuperProxy(SuperProxy):
+    """A proxy for super bound to a single patched function.
+
+    Calls to ``super().member`` in the function are compiled to pass the class and instance
+    of the caller explicitly, so neither of them nor the caller's code is found via frames.
+    """
+
+    def __init__(self, orig_class: PatchedClass, static: bool = False, slot: str | None = None) -> None:
+        super().__init__(orig_class)
+        self.static = static
+        self.slot = slot
+        self._code: weakref.ref[CodeType] | None = None
+        # Previous expressions of hybrid methods looked up from SQL expressions, per class the
+        # expression is called with
+        self._expressions: weakref.WeakKeyDictionary[type, dict[str, Any]] | None = \
+            weakref.WeakKeyDictionary() if slot == "expr" else None
+
+    @property
+    def code(self) -> CodeType | None:
+        """The code object of the function the proxy is bound to."""
+        return self._code() if self._code else None
+
+    def bind(self, code: CodeType) -> None:
+        """Bind the proxy to the code object of a patched function."""
+        # XXX: A weak reference is kept since the proxy is itself a constant of the code object
+        #      and code objects are not tracked by the garbage collector.
+        self._code = weakref.ref(code)
+
+    def __call__(self, patch_class: type | None = None, obj: object | None = None) -> Any:
+        """Wrapper for calls to super() in the bound function.
+
+        :param patch_class: The class to call super() on. Defaults to the class of the caller.
+        :param obj: The instance to call super() on. Ignored in static methods.
+        """
+        if patch_class is None:
+            patch_class, obj = self._get_defaults()
+        cache = None
+        if self._expressions is not None and isinstance(obj, type):
+            cache = self._expressions.get(obj)
+            if cache is None:
+                cache = self._expressions.setdefault(obj, {})
+        return Duper(self.orig_class, patch_class, None if self.static else obj, self.code, self.slot, cache)
+
+
+class CachedClassProperty(cached_classproperty):
+    """A cached class property whose values can be forgotten when the patches of a class change.
+
+    Indico's cached_classproperty replaces itself with its value in the class it is read from,
+    which would lose the patched member. Values are kept aside per class instead.
+
+    :param fget: The class method computing the value
+    """
+
+    # Instances whose values may need to be forgotten
+    _instances: weakref.WeakSet[CachedClassProperty] = weakref.WeakSet()
+
+    def __init__(self, fget: Any) -> None:
+        super().__init__(fget)
+        self.values: weakref.WeakKeyDictionary[type, Any] = weakref.WeakKeyDictionary()
+        CachedClassProperty._instances.add(self)
+
+    def __get__(self, obj: object | None, objtype: type | None = None) -> Any:
+        """Compute the value for a class the first time it is read."""
+        cls = objtype if objtype is not None else type(obj)
+        try:
+            return self.values[cls]
+        except KeyError:
+            getter: Any = self.fget
+            value = self.values[cls] = getter.__get__(None, cls)()
+            return value
+
+    @classmethod
+    def forget(cls, orig_class: type) -> None:
+        """Forget the values computed for a class and its subclasses."""
+        for prop in list(cls._instances):
+            for klass in [klass for klass in list(prop.values) if issubclass(klass, orig_class)]:
+                prop.values.pop(klass, None)
+
+
+class SuperGlobals(dict[str, Any]):
+    """Globals overlaying super() on the namespace of a module.
+
+    Only ``super`` and the names read by the interpreter when creating functions are stored,
+    every other lookup is delegated to the module namespace so that later assignments in the
+    module are seen by the patched functions.
+
+    CPython does not specialize global lookups in globals that are not exact dictionaries, so
+    every global read by functions using these globals goes through ``__missing__`` and is
+    several times slower than in the module globals. Only functions that still look up
+    ``super`` as a global (e.g. calling ``super()`` with arguments) use them.
+    """
+
+    def __init__(self, namespace: dict[str, Any], orig_class: PatchedClass) -> None:
+        super().__init__({
+            "__builtins__": namespace.get("__builtins__", builtins),
+            "__name__": namespace.get("__name__"),
+            "super": SuperProxy(orig_class),
+        })
+        self.namespace = namespace
+
+    def __missing__(self, key: str) -> Any:
+        """Look up names missing in the overlay in the module namespace."""
+        return self.namespace[key]
+
+
+# Class of the MRO defining each member, per class
+_member_index: weakref.WeakKeyDictionary[type, dict[str, type]] = weakref.WeakKeyDictionary()
+
+# Lock held while changing patched classes and the indexes shared between them
+# XXX: Reentrant since patching may trigger imports applying patches by import path
+patch_lock = threading.RLock()
+
+# Members patched in a batch whose super() resolution is not indexed yet
+_unindexed: dict[tuple[PatchedClass, str], None] | None = None
+
+# Globals shared by the patched functions of a module, per module namespace and original class
+_super_globals: weakref.WeakValueDictionary[tuple[int, int], SuperGlobals] = weakref.WeakValueDictionary()
+
+# Attribute access bypassing the interception in Duper
+_getattribute = object.__getattribute__
+_setattr = object.__setattr__
+
+
+class Duper:
+    """Interceptor for calls to super().getattr() in the patch class.
+
+    Assigning and deleting members of the proxy (e.g. ``super().prop = value`` in a property
+    setter) go through the setter and deleter of the previous version of the member.
+
+    Previous expressions of hybrid methods looked up from SQL expressions are kept in the cache
+    of the bound proxy, so that expressions called on every query only resolve them once per
+    class. They are bound callables, unlike the previous expressions of hybrid properties, which
+    are evaluated on every access.
+    """
+
+    __slots__ = ("cache", "code", "obj", "orig_class", "patch_class", "slot")
+
+    def __init__(self, orig_class: PatchedClass, patch_class: type | None, obj: object | None,
+                 code: CodeType | None = None, slot: str | None = None,
+                 cache: dict[str, Any] | None = None) -> None:
+        # XXX: Slots are set through `object` since attribute assignment is intercepted in this class
+        _setattr(self, "orig_class", orig_class)
+        _setattr(self, "patch_class", patch_class)
+        _setattr(self, "obj", obj)
+        _setattr(self, "code", code)
+        _setattr(self, "slot", slot)
+        _setattr(self, "cache", cache)
+
+    def __getattribute__(self, name: str) -> Any:
+        """Resolve the previous version of a member as seen from the caller."""
+        # XXX: Slots are read through `object` since attribute access is intercepted in this class
+        cache = _getattribute(self, "cache")
+        if cache is not None and name in cache:
+            return cache[name]
+        # Get the code object of the caller to identify which member is being accessed in super()
+        current_code = _getattribute(self, "code") or SuperProxy._get_caller_code()
+        orig_class = _getattribute(self, "orig_class")
+        obj = _getattribute(self, "obj")
+        if (resolved := _resolve_super(orig_class, name, current_code)) is not None:
+            category, member = resolved
+            previous = _bind_previous(orig_class, category, member, obj, _getattribute(self, "slot"))
+            # Only the previous version of the caller's own member is known to never change
+            if cache is not None and category == "hybrid_methods" and _is_version(orig_class, name, current_code):
+                cache[name] = previous
+            return previous
+
+        # Fallback to the original class' member
+        return getattr(obj, name) if obj else getattr(orig_class, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Assign a member through the setter of its previous version as seen from the caller."""
+        current_code = _getattribute(self, "code") or SuperProxy._get_caller_code()
+        resolved = _resolve_super(_getattribute(self, "orig_class"), name, current_code)
+        if resolved is None or resolved[0] not in PROPERTY_CATEGORIES:
+            raise AttributeError(f"duper object has no settable attribute '{name}'")
+        resolved[1].__set__(_getattribute(self, "obj"), value)
+
+    def __delattr__(self, name: str) -> None:
+        """Delete a member through the deleter of its previous version as seen from the caller."""
+        current_code = _getattribute(self, "code") or SuperProxy._get_caller_code()
+        resolved = _resolve_super(_getattribute(self, "orig_class"), name, current_code)
+        if resolved is None or resolved[0] not in PROPERTY_CATEGORIES:
+            raise AttributeError(f"duper object has no deletable attribute '{name}'")
+        resolved[1].__delete__(_getattribute(self, "obj"))
+
+    def __repr__(self) -> str:
+        """Represent the proxy with the patch class and the instance it is bound to."""
+        patch_class = _getattribute(self, "patch_class")
+        classname = f"{patch_class.__module__}.{patch_class.__name__}" if patch_class else None
+        return f"<duper: {classname}, {_getattribute(self, 'obj')}>"
+
+
+def _resolve_super(orig_class: PatchedClass, name: str, current_code: CodeType | None) -> tuple[str, Any] | None:
+    """Look up the previous version of a member precomputed at patch time.
+
+    :param orig_class: The class the member is patched in
+    :param name: The name of the member
+    :param current_code: The code object of the caller of super()
+    :return: The category and previous version of the member, or None if it was not patched
+    """
+    resolution = orig_class.__resolution__
+    try:
+        resolved = resolution[name, current_code]
+    except KeyError:
+        resolved = resolution.get((name, None))
+    # Avoid infinite recursion when the member is missing in the original class
+    # (e.g. new member added in patch class)
+    if resolved is not None and resolved[0] == "missing":
+        raise AttributeError(f"duper object has no attribute '{name}'")
+    return resolved
+
+
+def _is_version(orig_class: PatchedClass, name: str, code: CodeType | None) -> bool:
+    """Check whether a code object belongs to the current or a stored version of a member."""
+    if (name, code) in orig_class.__resolution__:
+        return True
+    return any(member_code is code for member_code in _get_codes(orig_class.__dict__.get(name)))
+
 
 def get_members(cls: type) -> MappingProxyType[str, Any]:
     """Get a dictionary of all the members of the base classes up to object."""
     if cls is object:
         raise TypeError("Cannot get members for object")
-    dicts = [cls.__dict__]
-    for base in cls.__bases__:
-        if base is object:
-            continue
-        dicts.insert(0, get_members(base))
-    return MappingProxyType({k: v for d in dicts for k, v in d.items()})
+    return MappingProxyType({name: owner.__dict__[name] for name, owner in _get_member_index(cls).items()})
+
+
+def get_member(cls: type, member_name: str) -> Any:
+    """Get a member of a class or its base classes up to object.
+
+    :param cls: The class to get the member from
+    :param member_name: The name of the member to get
+    :return: The member, or `MISSING` if it is not defined in any class but object
+    """
+    owner = _get_member_index(cls).get(member_name)
+    # Members set directly in the class outside of patches (e.g. by SQLAlchemy) take precedence
+    if member_name in cls.__dict__:
+        return cls.__dict__[member_name]
+    if owner is not None and member_name in owner.__dict__:
+        return owner.__dict__[member_name]
+    # Fall back to walking the MRO in case the class hierarchy was modified outside of patches
+    for klass in cls.__mro__:
+        if klass is not object and member_name in klass.__dict__:
+            return klass.__dict__[member_name]
+    return MISSING
+
+
+def _get_member_index(cls: type) -> dict[str, type]:
+    """Get the index of the class defining each member of a class following its MRO.
+
+    The index is built once per class and kept up to date by `_set_member`.
+    """
+    index = _member_index.get(cls)
+    if index is None:
+        index = _member_index[cls] = {
+            name: klass
+            for klass in reversed(cls.__mro__) if klass is not object
+            for name in klass.__dict__
+        }
+    return index
+
+
+def _set_member(orig_class: PatchedClass, member_name: str, member: Any) -> None:
+    """Set a member in a class keeping the member indexes up to date.
+
+    :param orig_class: The class to set the member in
+    :param member_name: The name of the member to set
+    :param member: The member object to set
+    """
+    setattr(orig_class, member_name, member)
+    if (index := _member_index.get(orig_class)) is not None:
+        index[member_name] = orig_class
+    # Subclasses may now resolve the member to the patched class
+    _reset_subclass_indexes(orig_class)
+
+
+def _delete_member(orig_class: PatchedClass, member_name: str) -> None:
+    """Delete a member from a class and update the member index accordingly.
+
+    :param orig_class: The class to delete the member from
+    :param member_name: The name of the member to delete
+    """
+    delattr(orig_class, member_name)
+    # The class and its subclasses may now resolve the member to a parent class
+    _member_index.pop(orig_class, None)
+    _reset_subclass_indexes(orig_class)
+
+
+def _reset_subclass_indexes(orig_class: type) -> None:
+    """Forget the member index of all subclasses of a class."""
+    subclasses: list[type] = orig_class.__subclasses__()
+    while subclasses:
+        subclass = subclasses.pop()
+        _member_index.pop(subclass, None)
+        subclasses.extend(subclass.__subclasses__())
 
 
 def patch_member(orig_class: PatchedClass, member_name: str, member: Any) -> None:
@@ -144,10 +450,19 @@ def patch_member(orig_class: PatchedClass, member_name: str, member: Any) -> Non
     """
     # TODO: Patch relationship
     # TODO: Patch deferred columns
-    if isinstance(member, property):
+    # XXX: Class properties from Indico are properties too, so they must be checked first
+    if isinstance(member, classproperty):
+        _patch_classproperty(orig_class, member_name, member, "classproperties")
+    elif isinstance(member, cached_classproperty):
+        _patch_classproperty(orig_class, member_name, member, "cached_classproperties")
+    elif isinstance(member, property):
         _patch_propertylike(orig_class, member_name, member, "properties", ("fget", "fset", "fdel"))
     elif isinstance(member, hybrid_property):
         _patch_propertylike(orig_class, member_name, member, "hybrid_properties", ("fget", "fset", "fdel", "expr"))
+    elif isinstance(member, hybrid_method):
+        _patch_hybrid_method(orig_class, member_name, member)
+    elif isinstance(member, cached_property):
+        _patch_cached_property(orig_class, member_name, member)
     elif isinstance(member, FunctionType):
         _patch_methodlike(orig_class, member_name, member, "methods")
     elif isinstance(member, classmethod):
@@ -166,7 +481,7 @@ def _patch_attr(orig_class: PatchedClass, attr_name: str, attr: Any) -> None:
     :param attr: The attribute object to replace the original attribute with
     """
     _store_unpatched(orig_class, attr_name, "attributes")
-    setattr(orig_class, attr_name, attr)
+    _set_member(orig_class, attr_name, attr)
 
 
 def _patch_propertylike(orig_class: PatchedClass, prop_name: str, prop: propertylike,
@@ -186,16 +501,21 @@ def _patch_propertylike(orig_class: PatchedClass, prop_name: str, prop: property
         raise ValueError(f"Unsupported descriptor method '{list(unsupported_fnames)[0]}'")
     # Keep a reference to the original property-like member
     _store_unpatched(orig_class, prop_name, category)
-    # Inject super() in the property descriptor methods
+    # Inject super() in the property descriptor methods, each bound to its own descriptor slot
     # TODO: Figure out how to avoid casting
     funcs: PropertyDescriptors | HybridPropertyDescriptors = cast(PropertyDescriptors | HybridPropertyDescriptors, {
-        fname: _inject_super_proxy(getattr(prop, fname), orig_class) if fname in SUPER_ENABLED_DESCRIPTORS else
-               getattr(prop, fname)
+        fname: _inject_super_proxy(func, orig_class, slot=fname) if fname in SUPER_ENABLED_DESCRIPTORS and func else
+               func
         for fname in fnames
+        for func in (getattr(prop, fname),)
     })
+    # Record reads of the property-like member if instrumentation is enabled
+    if metrics.is_enabled() and funcs["fget"]:
+        funcs["fget"] = cast(FunctionType, metrics.instrument(funcs["fget"], orig_class, prop_name))
+    _register_profiled(funcs["fget"], "patch", orig_class, prop_name)
     new_prop = property(**funcs) if isinstance(prop, property) else hybrid_property(**funcs)
     # Replace the original property-like member
-    setattr(orig_class, prop_name, new_prop)
+    _set_member(orig_class, prop_name, new_prop)
 
 
 def _patch_methodlike(orig_class: PatchedClass, method_name: str, method: methodlike, category: str) -> None:
@@ -214,10 +534,116 @@ def _patch_methodlike(orig_class: PatchedClass, method_name: str, method: method
     # XXX: Type is casted and type checking is disabled because mypy infers the wrong types
     #      for __func__ in classmethods (https://github.com/python/mypy/issues/3482)
     func = method if isinstance(method, FunctionType) else cast(FunctionType, method.__func__)
-    new_func = _inject_super_proxy(func, orig_class)
+    new_func = _inject_super_proxy(func, orig_class, static=isinstance(method, staticmethod))
+    _register_profiled(new_func, "patch", orig_class, method_name)
+    # Record calls to the method-like member if instrumentation is enabled
+    if metrics.is_enabled():
+        new_func = cast(FunctionType, metrics.instrument(new_func, orig_class, method_name))
     new_method = classmethod(new_func) if isinstance(method, classmethod) else new_func
     # Replace the original method
-    setattr(orig_class, method_name, new_method)
+    _set_member(orig_class, method_name, new_method)
+
+
+def _patch_classproperty(orig_class: PatchedClass, prop_name: str, prop: property, category: str) -> None:
+    """Patch a class property from Indico in a class.
+
+    :param orig_class: The class to patch
+    :param prop_name: The name of the class property to patch in the class
+    :param prop: The class property to replace the original member with
+    :param category: The category of unpatched members to store the original member in
+    """
+    if category not in CLASSPROPERTY_CATEGORIES:
+        raise ValueError(f"Unsupported category '{category}'")
+    # Keep a reference to the original class property
+    _store_unpatched(orig_class, prop_name, category)
+    # Inject super() in the getter, which is usually a class method
+    getter: Any = prop.fget
+    is_classmethod = isinstance(getter, classmethod)
+    func = cast(FunctionType, getter.__func__ if isinstance(getter, classmethod | staticmethod) else getter)
+    new_func = _inject_super_proxy(func, orig_class, static=not is_classmethod, slot="fget")
+    _register_profiled(new_func, "patch", orig_class, prop_name)
+    # Record reads of the class property if instrumentation is enabled
+    if metrics.is_enabled():
+        new_func = cast(FunctionType, metrics.instrument(new_func, orig_class, prop_name))
+    new_getter: Any = classmethod(new_func) if is_classmethod else staticmethod(new_func)
+    # Cached values are kept aside so that they can be forgotten when patches change
+    new_prop = CachedClassProperty(new_getter) if category == "cached_classproperties" else type(prop)(new_getter)
+    if category == "cached_classproperties":
+        _forget_cached_values(orig_class, prop_name, orig_class.__dict__.get(prop_name))
+    # Replace the original class property
+    _set_member(orig_class, prop_name, new_prop)
+
+
+def _forget_cached_values(orig_class: PatchedClass, prop_name: str, prop: Any) -> None:
+    """Delete the values Indico's cached_classproperty stored in the subclasses of a class.
+
+    Indico's cached_classproperty stores its value in the class it is read from. Values stored
+    in subclasses before patching would hide the patched member, so they are deleted from them.
+    As they look like any other class attribute, only values matching the one computed by the
+    original getter for the subclass are deleted, keeping overrides and what inherits them.
+
+    :param orig_class: The class the cached class property is patched in
+    :param prop_name: The name of the cached class property
+    :param prop: The member replaced in the class
+    """
+    # Only Indico's cached_classproperty stores values, which are already gone after a first patch
+    if not isinstance(prop, cached_classproperty) or isinstance(prop, CachedClassProperty):
+        return
+    getter: Any = prop.fget
+    subclasses: list[type] = orig_class.__subclasses__()
+    while subclasses:
+        subclass = subclasses.pop()
+        if prop_name in subclass.__dict__:
+            value = subclass.__dict__[prop_name]
+            if hasattr(type(value), "__get__"):
+                continue
+            if value is not (computed := getter.__get__(None, subclass)()) and value != computed:
+                continue
+            _delete_member(cast(PatchedClass, subclass), prop_name)
+        subclasses.extend(subclass.__subclasses__())
+
+
+def _patch_cached_property(orig_class: PatchedClass, prop_name: str, prop: cached_property[Any]) -> None:
+    """Patch a cached property in a class.
+
+    :param orig_class: The class to patch
+    :param prop_name: The name of the cached property to patch in the class
+    :param prop: The cached property to replace the original member with
+    """
+    # Keep a reference to the original member
+    _store_unpatched(orig_class, prop_name, "cached_properties")
+    # Inject super() in the function computing the value
+    new_func = _inject_super_proxy(cast(FunctionType, prop.func), orig_class)
+    _register_profiled(new_func, "patch", orig_class, prop_name)
+    # Record computations of the cached property if instrumentation is enabled
+    if metrics.is_enabled():
+        new_func = cast(FunctionType, metrics.instrument(new_func, orig_class, prop_name))
+    new_prop = cached_property(new_func)
+    # XXX: `__set_name__` is only called on class creation, so the name the value is cached
+    #      under in instances must be set for the original class explicitly
+    new_prop.__set_name__(orig_class, prop_name)
+    # Replace the original member
+    _set_member(orig_class, prop_name, new_prop)
+
+
+def _patch_hybrid_method(orig_class: PatchedClass, method_name: str, method: hybrid_method) -> None:
+    """Patch a hybrid method in a class.
+
+    :param orig_class: The class to patch
+    :param method_name: The name of the hybrid method to patch in the class
+    :param method: The hybrid method to replace the original member with
+    """
+    # Keep a reference to the original hybrid method
+    _store_unpatched(orig_class, method_name, "hybrid_methods")
+    # Inject super() in the instance and expression sides, even if they share the same function
+    func = _inject_super_proxy(method.func, orig_class, slot="func")
+    expr = _inject_super_proxy(method.expr, orig_class, slot="expr")
+    _register_profiled(func, "patch", orig_class, method_name)
+    # Record calls to the hybrid method on instances if instrumentation is enabled
+    if metrics.is_enabled():
+        func = cast(FunctionType, metrics.instrument(func, orig_class, method_name))
+    # Replace the original hybrid method
+    _set_member(orig_class, method_name, hybrid_method(func, expr))
 
 
 def _store_unpatched(orig_class: PatchedClass, member_name: str, category: str) -> None:
@@ -228,35 +654,445 @@ def _store_unpatched(orig_class: PatchedClass, member_name: str, category: str)
     :param category: The category of unpatched members to store the original member in
     """
     # TODO: Fail if the member was already patched in any other category
-    orig_members = get_members(orig_class)
-    # None can be a valid value for the member, so we need to check if the member is in the class dict
-    if member_name in orig_members:
-        orig_class.__unpatched__[category][member_name].append(orig_members[member_name])
+    orig_member = get_member(orig_class, member_name)
+    # None can be a valid value for the member, so we need to check against a sentinel
+    if orig_member is not MISSING:
+        stack = orig_class.__unpatched__.add(category, member_name, orig_member)
+        # Keep track of the member before any patch to profile it
+        if len(stack) == 1:
+            _register_profiled(orig_member, "original", orig_class, member_name)
     else:
         # Since new members are patched into the original class, we need to keep track
         # if members are missing in the original class to avoid infinite recursion with super().
-        orig_class.__unpatched__["missing"][member_name].append(None)
+        orig_class.__unpatched__.add("missing", member_name, None)
+    # Index the member right away unless patches are being applied in a batch
+    if _unindexed is not None:
+        _unindexed[orig_class, member_name] = None
+        # Readers may call the member installed next before the batch is indexed, so publish
+        # how super() resolves for it and for the version it replaces before installing it
+        codes = {None, *(_get_codes(orig_member) if orig_member is not MISSING else ())}
+        orig_class.__resolution__.update(_resolve_member(orig_class, member_name, codes))
+    else:
+        _index_previous(orig_class, member_name)
+
+
+def revert_members(orig_class: PatchedClass, counts: Mapping[tuple[str, str], int]) -> None:
+    """Restore the members of a class to the versions they had before later patches.
+
+    Members that were missing are deleted and every stored version newer than the restored
+    one is forgotten. Attributes managed by SQLAlchemy mappers (e.g. columns) are left in
+    place since they cannot be removed from their mapper.
+
+    :param orig_class: The class to restore the members of
+    :param counts: The number of stored versions to keep per category and member name,
+                   members without an entry are restored to their original version
+    """
+    registry = orig_class.__unpatched__
+    reverted: set[str] = set()
+    # Members that were missing must be deleted even if they were patched again afterwards
+    for category, member_name, versions in sorted(registry.members(), key=lambda item: item[0] != "missing"):
+        count = counts.get((category, member_name), 0)
+        if len(versions) <= count:
+            continue
+        if member_name not in reverted and not isinstance(orig_class.__dict__.get(member_name), QueryableAttribute):
+            if category == "missing" or (count == 0 and _get_inherited(orig_class, member_name) is versions[0]):
+                _delete_member(orig_class, member_name)
+            else:
+                _set_member(orig_class, member_name, versions[count])
+        reverted.add(member_name)
+        registry.truncate(category, member_name, count)
+        # Forget the versions kept for compiled calls to super()
+        for version in range(count, len(versions)):
+            if (private_name := _get_private_name(orig_class, category, version, member_name)) in orig_class.__dict__:
+                _delete_member(orig_class, private_name)
+    # Reindex the super() resolution of the reverted members that are still patched, publishing
+    # the new entries before forgetting the stale ones
+    resolution = orig_class.__resolution__
+    entries: dict[tuple[str, Any], tuple[str, Any] | None] = {}
+    for member_name in reverted & {name for _, name, _ in registry.members()}:
+        entries.update(_resolve_member(orig_class, member_name))
+    resolution.update(entries)
+    for key in [key for key in resolution if key[0] in reverted and key not in entries]:
+        del resolution[key]
+
+
+def _get_inherited(orig_class: type, member_name: str) -> Any:
+    """Get a member of a class as inherited from its base classes, or `MISSING`."""
+    for klass in orig_class.__mro__[1:]:
+        if klass is not object and member_name in klass.__dict__:
+            return klass.__dict__[member_name]
+    return MISSING
+
+
+@contextmanager
+def deferred_indexing() -> Iterator[None]:
+    """Context manager to index the super() resolution of patched members once on exit.
+
+    Members patched multiple times within the context are only indexed once.
+    """
+    global _unindexed
+    # Members in nested contexts are indexed with the outermost one
+    if _unindexed is not None:
+        yield
+        return
+    unindexed: dict[tuple[PatchedClass, str], None] = {}
+    _unindexed = unindexed
+    try:
+        yield
+    finally:
+        _unindexed = None
+        for orig_class, member_name in unindexed:
+            _index_previous(orig_class, member_name)
+
+
+def _index_previous(orig_class: PatchedClass, member_name: str) -> None:
+    """Precompute how super() resolves a member for every known caller.
+
+    :param orig_class: The class to store the resolution index in
+    :param member_name: The name of the member to index
+    """
+    # Publish all the entries at once so that concurrent calls to super() never see them half updated
+    orig_class.__resolution__.update(_resolve_member(orig_class, member_name))
+
 
+def _resolve_member(orig_class: PatchedClass, member_name: str,
+                    codes: set[Any] | None = None) -> dict[tuple[str, Any], tuple[str, Any] | None]:
+    """Resolve the previous version of a member for every known caller.
 
-def _inject_super_proxy(func: FunctionType, orig_class: PatchedClass) -> FunctionType:
+    :param orig_class: The class the member is patched in
+    :param member_name: The name of the member to resolve
+    :param codes: The code objects of the callers to resolve, all known callers by default
+    """
+    # Callers are identified by the code object of the stored versions of the member
+    if codes is None:
+        codes = {None}
+        for category in SUPER_CATEGORIES:
+            for candidate in orig_class.__unpatched__.get(category, member_name):
+                codes.update(_get_codes(candidate))
+    # Unknown callers (e.g. the latest patch) are resolved with the `None` entry
+    return {(member_name, code): SuperProxy._resolve_previous(orig_class, member_name, code) for code in codes}
+
+
+def _inject_super_proxy(func: FunctionType, orig_class: PatchedClass, static: bool = False,
+                        slot: str | None = None) -> FunctionType:
     """Return a new function from which super() will call SuperProxy().
 
     :param func: The function that will get SuperProxy injected
     :param orig_class: The original class that will be passed to SuperProxy
+    :param static: Whether the function is a static method and has no instance to bind
+    :param slot: The property descriptor method (e.g. fget, fset) the function is used as
+    """
+    code, uses_global_super = _bind_super_calls(func.__code__, BoundSuperProxy(orig_class, static, slot))
+    # Only functions still looking up `super` as a global need it overlaid in their globals
+    globals = _get_super_globals(func.__globals__, orig_class) if uses_global_super else func.__globals__
+    return FunctionType(code, globals, func.__name__, func.__defaults__, func.__closure__)
+
+
+def _get_super_globals(namespace: dict[str, Any], orig_class: PatchedClass) -> SuperGlobals:
+    """Get the globals shared by the patched functions of a module for an original class.
+
+    :param namespace: The globals of the module the patched functions are defined in
+    :param orig_class: The original class that will be passed to SuperProxy
+    """
+    key = (id(namespace), id(orig_class))
+    super_globals = _super_globals.get(key)
+    if super_globals is None:
+        super_globals = _super_globals[key] = SuperGlobals(namespace, orig_class)
+    return super_globals
+
+
+def _uses_global_super(code: CodeType) -> bool:
+    """Check whether a code object or any code nested in it may look up `super` as a global."""
+    # Functions defined at runtime in the code inherit its globals
+    return "super" in code.co_names or any(
+        _uses_global_super(const) for const in code.co_consts if isinstance(const, CodeType)
+    )
+
+
+def _get_instructions(code: CodeType) -> list[tuple[int, int, int]]:
+    """Decode the offset, opcode and argument of the instructions of a code object.
+
+    This is much cheaper than `dis.get_instructions`, which resolves the argument of every
+    instruction. Inline caches are skipped, while EXTENDED_ARG prefixes are kept as separate
+    instructions and included in the argument of the instruction they extend.
+
+    :param code: The code object to decode
+    """
+    bytecode = code.co_code
+    instructions = []
+    arg = 0
+    for offset in range(0, len(bytecode), 2):
+        opcode = bytecode[offset]
+        # Inline caches of the original code object are always zeroed
+        if opcode == CACHE:
+            continue
+        arg |= bytecode[offset + 1]
+        instructions.append((offset, opcode, arg))
+        arg = arg << 8 if opcode == EXTENDED_ARG else 0
+    return instructions
+
+
+def _bind_super_calls(code: CodeType, proxy: BoundSuperProxy) -> tuple[CodeType, bool]:
+    """Compile zero-argument calls to super() in a code object to use a bound proxy.
+
+    Zero-argument calls to super() load the global ``super`` and call it without arguments,
+    so the proxy would need to inspect frames to find the caller. Calls to ``super().member``
+    are compiled with a dedicated instruction, while other calls (e.g. assigning or deleting
+    ``super().member``) call ``super`` as any other global. Both are rewritten to load the
+    proxy as a constant and to pass ``__class__`` and the first argument of the function
+    explicitly, as the interpreter does with two-argument calls to super(). Other uses of
+    ``super`` are left untouched and resolved through the function globals.
+
+    :param code: The code object to rewrite
+    :param proxy: The proxy to bind to the rewritten code object
+    :return: The rewritten code object, or the original one if there was nothing to rewrite,
+             and whether it may still look up ``super`` as a global
+    """
+    const_index = len(code.co_consts)
+    # The proxy constant must be addressable without an EXTENDED_ARG prefix
+    if not BIND_SUPER_CALLS or "super" not in code.co_names or const_index > 0xFF:
+        return code, _uses_global_super(code)
+    # Zero-argument calls to super() read `__class__` and the first argument of the function
+    localsplus = (*code.co_varnames, *(name for name in code.co_cellvars if name not in code.co_varnames),
+                  *code.co_freevars)
+    class_index = localsplus.index("__class__") if "__class__" in code.co_freevars else 0x100
+    if not code.co_argcount or class_index > 0xFF:
+        return code, _uses_global_super(code)
+    super_index = code.co_names.index("super")
+    load_self = (LOAD_DEREF if code.co_varnames[0] in code.co_cellvars else LOAD_FAST_CHECK, 0)
+    bytecode = bytearray(code.co_code)
+    instructions = _get_instructions(code)
+    loads_global_super = False
+    rewritten = False
+    for idx, (offset, opcode, arg) in enumerate(instructions):
+        if opcode != LOAD_GLOBAL or arg >> 1 != super_index:
+            continue
+        extended = idx > 0 and instructions[idx - 1][1] == EXTENDED_ARG
+        following = [instr[1:] for instr in instructions[idx + 1:idx + 4]]
+        # Calls to `super().member` are compiled as `super` + `__class__` + first argument + LOAD_SUPER_ATTR
+        if (not extended and len(following) == 3 and following[0] == (LOAD_DEREF, class_index)
+                and following[2][0] == LOAD_SUPER_ATTR and not following[2][1] & SUPER_ATTR_TWO_ARGS):
+            # Replace the global lookup and its inline cache with the proxy constant
+            size = instructions[idx + 1][0] - offset
+            bytecode[offset:offset + size] = bytes((LOAD_CONST, const_index) + (NOP, 0) * (size // 2 - 1))
+            # Flag the call as having explicit arguments
+            bytecode[instructions[idx + 3][0] + 1] |= SUPER_ATTR_TWO_ARGS
+            rewritten = True
+        # Other calls are compiled as `super` and a NULL + CALL without arguments
+        elif not extended and arg & LOAD_GLOBAL_NULL and following[0] == (CALL, 0):
+            # Replace both instructions and their inline caches with a call to the proxy constant
+            # with `__class__` and the first argument, padded to keep the offsets of the code
+            call_offset = instructions[idx + 1][0]
+            end = instructions[idx + 2][0] if idx + 2 < len(instructions) else len(bytecode)
+            push_proxy = (PUSH_NULL, 0, LOAD_CONST, const_index)
+            if not PUSH_NULL_FIRST:
+                push_proxy = push_proxy[2:] + push_proxy[:2]
+            padding = (NOP, 0) * ((call_offset - offset) // 2 - 4)
+            call = (LOAD_DEREF, class_index, *load_self, CALL, 2) + (CACHE, 0) * ((end - call_offset) // 2 - 1)
+            bytecode[offset:end] = bytes(push_proxy + padding + call)
+            rewritten = True
+        else:
+            loads_global_super = True
+    uses_global_super = loads_global_super or any(
+        _uses_global_super(const) for const in code.co_consts if isinstance(const, CodeType)
+    )
+    if not rewritten:
+        return code, uses_global_super
+    # Both arguments of the rewritten calls are pushed on top of the stack
+    new_code = code.replace(co_code=bytes(bytecode), co_consts=(*code.co_consts, proxy),
+                            co_stacksize=code.co_stacksize + 2)
+    proxy.bind(new_code)
+    return new_code, uses_global_super
+
+
+def compile_super_calls(orig_class: PatchedClass) -> None:
+    """Compile calls to super() in the patched members of a class to plain attribute lookups.
+
+    The previous version of a member never changes once it is overridden by a patch, so calls
+    to ``super().member`` from any version of the member itself can skip SuperProxy entirely.
+    The previous version is set in the original class under a private name that the call
+    looks up in the instance (or class) instead, as with any other member.
+
+    :param orig_class: The class whose patched members to compile
+    """
+    member_names = {name for category in SUPER_CATEGORIES for name in orig_class.__unpatched__.names(category)}
+    compiled: set[int] = set()
+    for member_name in member_names:
+        versions = [orig_class.__dict__.get(member_name)]
+        for category in SUPER_CATEGORIES:
+            versions.extend(orig_class.__unpatched__.get(category, member_name))
+        for version in versions:
+            func = _unwrap_callable(version)
+            if isinstance(func, FunctionType) and id(func) not in compiled:
+                compiled.add(id(func))
+                _compile_function(orig_class, member_name, func)
+    # Callers are identified by code objects, which changed for compiled functions
+    for member_name in member_names:
+        _index_previous(orig_class, member_name)
+
+
+def _compile_function(orig_class: PatchedClass, member_name: str, func: FunctionType) -> None:
+    """Compile calls to ``super().member`` in a version of the member itself.
+
+    :param orig_class: The class the function was patched in
+    :param member_name: The name of the member the function is a version of
+    :param func: The function to compile
+    """
+    code = func.__code__
+    proxy = next((const for const in code.co_consts if isinstance(const, BoundSuperProxy)), None)
+    # Only functions with bound calls to super() for this class can be compiled, which
+    # excludes property descriptor methods other than getters
+    if proxy is None or proxy.orig_class is not orig_class or proxy.static or proxy.slot not in {None, "fget"}:
+        return
+    try:
+        resolved = orig_class.__resolution__[member_name, code]
+    except KeyError:
+        resolved = orig_class.__resolution__.get((member_name, None))
+    if resolved is None or resolved[0] not in COMPILED_CATEGORIES:
+        return
+    category, member = resolved
+    # The constant and the name must be addressable without an EXTENDED_ARG prefix
+    const_index, name_index = len(code.co_consts), len(code.co_names)
+    if const_index > 0xFF or name_index > 0xFF >> 2:
+        return
+    # Keep the previous version in the class under a private name
+    version = next(idx for idx, stored in enumerate(orig_class.__unpatched__.get(category, member_name))
+                   if stored is member)
+    private_name = _get_private_name(orig_class, category, version, member_name)
+    if private_name not in orig_class.__dict__:
+        setattr(orig_class, private_name, member)
+    bytecode = bytearray(code.co_code)
+    instructions = _get_instructions(code)
+    rewritten = False
+    for idx, (offset, opcode, arg) in enumerate(instructions):
+        if opcode != LOAD_SUPER_ATTR or code.co_names[arg >> 2] != member_name:
+            continue
+        if instructions[idx - 1][1] == EXTENDED_ARG:
+            continue
+        # Find the proxy constant loaded for the call, followed by the inline cache of the global lookup
+        load_idx = idx - 3
+        while load_idx > 0 and instructions[load_idx][1] == NOP:
+            load_idx -= 1
+        load_offset, load_opcode, load_arg = instructions[load_idx]
+        if load_opcode != LOAD_CONST or code.co_consts[load_arg] is not proxy:
+            continue
+        # Look up the private name in the instance returned by the stand-in for super()
+        bytecode[load_offset + 1] = const_index
+        bytecode[offset + 1] = name_index << 2 | arg & 0b11
+        rewritten = True
+    if not rewritten:
+        return
+    new_code = code.replace(co_code=bytes(bytecode), co_consts=(*code.co_consts, _compiled_super),
+                            co_names=(*code.co_names, private_name))
+    proxy.bind(new_code)
+    profiling.register(new_code, "patch", orig_class, member_name)
+    # Resolve the new code object as the old one before installing it
+    orig_class.__resolution__[member_name, new_code] = resolved
+    func.__code__ = new_code
+
+
+def _get_private_name(orig_class: PatchedClass, category: str, version: int, member_name: str) -> str:
+    """Get the name a previous version of a member is kept under for compiled calls to super().
+
+    The name is unique per original class, since compiled calls look it up in the instance and
+    patched subclasses keep their own previous versions under the same member name.
+
+    :param orig_class: The class the member is patched in
+    :param category: The category of unpatched members the version is stored in
+    :param version: The index of the version in the stored versions of the member
+    :param member_name: The name of the member
+    """
+    return f"__unpatched_{id(orig_class):x}_{category}_{version}_{member_name}__"
+
+
+def _compiled_super(patch_class: type, obj: object) -> object:
+    """Stand-in for super() in compiled calls returning where to look up the previous version."""
+    return obj
+
+
+def _bind_previous(orig_class: PatchedClass, category: str, member: Any, obj: object | None,
+                   slot: str | None = None) -> Any:
+    """Bind the previous version of a member to the instance or class calling super().
+
+    :param orig_class: The class the member was patched in
+    :param category: The category of unpatched members the member was stored in
+    :param member: The previous version of the member
+    :param obj: The instance to bind the member to
+    :param slot: The property descriptor method calling super(), if any
     """
-    globals = func.__globals__.copy()
-    globals["super"] = SuperProxy(orig_class)
-    return FunctionType(func.__code__, globals, func.__name__, func.__defaults__, func.__closure__)
+    # Expressions of hybrid properties and methods are called with the class instead of an instance
+    if category in EXPRESSION_CATEGORIES and slot == "expr":
+        return member.__get__(None, obj)
+    # The previous value is computed without caching it in the instance, where the patched value goes
+    if category == "cached_properties":
+        if isinstance(member, cached_property):
+            return member.func(obj)
+        return member.__get__(obj, type(obj)) if hasattr(member, "__get__") else member
+    # Class properties are computed for the class calling super(), bypassing any cached value
+    if category in CLASSPROPERTY_CATEGORIES:
+        # Values cached by Indico in the class before it was patched are used as they are
+        if not isinstance(member, property):
+            return member
+        getter: Any = member.fget
+        return getter.__get__(None, obj if obj is not None else orig_class)()
+    # XXX: Reading a member always uses `fget`, even from setters and deleters. Assigning and
+    #      deleting it is handled by Duper since `super()` does not support data descriptors.
+    #      Bug report: https://bugs.python.org/issue14965
+    if category in PROPERTY_CATEGORIES:
+        return member.fget(obj)
+    if category == "methods":
+        return partial(member, obj)
+    if category == "hybrid_methods":
+        return member.__get__(obj, type(obj))
+    if category == "classmethods":
+        # Bind to the class of the caller as compiled calls to super() and the built-in super() do
+        cls = obj if isinstance(obj, type) else type(obj) if obj is not None else orig_class
+        return partial(member.__func__, cls)
+    return member
+
+
+def _register_profiled(member: Any, category: str, orig_class: PatchedClass, member_name: str) -> None:
+    """Register the code of a patched or original member to be profiled, if it has any.
+
+    :param member: The member to register
+    :param category: Whether the member is a "patch" or the "original" member
+    :param orig_class: The class the member is patched in
+    :param member_name: The name of the member
+    """
+    if isinstance(code := getattr(_unwrap_callable(member), "__code__", None), CodeType):
+        profiling.register(code, category, orig_class, member_name)
+
+
+def _get_codes(member: Any) -> list[Any]:
+    """Get the code objects identifying a version of a member as a caller of super().
+
+    Property-like members and hybrid methods are identified by the code objects of all their
+    descriptor methods.
+    """
+    if isinstance(member, property | hybrid_property):
+        funcs = [func for fname in SUPER_ENABLED_DESCRIPTORS if (func := getattr(member, fname, None))]
+        return [getattr(_unwrap_callable(func), "__code__", None) for func in funcs]
+    if isinstance(member, hybrid_method):
+        funcs = [member.func, member.expr]
+        return [getattr(getattr(func, "__instrumented__", func), "__code__", None) for func in funcs]
+    return [getattr(_unwrap_callable(member), "__code__", None)]
 
 
 def _unwrap_callable(member: Any) -> Any:
     """Return the underlying function used for identity comparisons."""
+    func = member
     if isinstance(member, classmethod):
-        return member.__func__
-    if isinstance(member, staticmethod):
-        return member.__func__
-    if isinstance(member, property):
-        return member.fget
-    if isinstance(member, hybrid_property):
-        return member.fget
-    return member
+        func = member.__func__
+    elif isinstance(member, staticmethod):
+        func = member.__func__
+    elif isinstance(member, property):
+        func = member.fget
+    elif isinstance(member, hybrid_property):
+        func = member.fget
+    elif isinstance(member, hybrid_method | cached_property):
+        func = member.func
+    # Getters of class properties are class or static methods
+    if isinstance(func, classmethod | staticmethod):
+        func = func.__func__
+    # Instrumented functions are identified by the patched function they wrap
+    return getattr(func, "__instrumented__", func)
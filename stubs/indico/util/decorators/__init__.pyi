@@ -0,0 +1,14 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from typing import Any
+
+class classproperty(property):
+    def __get__(self, obj: object | None, type: type | None = None) -> Any: ...
+
+
+class strict_classproperty(classproperty): ...
+
+
+class cached_classproperty(property):
+    def __get__(self, obj: object | None, objtype: type | None = None) -> Any: ...
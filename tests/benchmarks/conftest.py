@@ -0,0 +1,146 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import gc
+import json
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+# Storage for the results of all benchmarks in the session
+results_key = pytest.StashKey[list["BenchmarkResult | MemoryResult"]]()
+# Storage for the names of benchmarks that regressed compared to the baseline
+regressions_key = pytest.StashKey[list[str]]()
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    number: int
+    best: float
+
+    @property
+    def ops(self) -> float:
+        """Number of operations per second."""
+        return 1 / self.best if self.best else float("inf")
+
+    @property
+    def value(self) -> float:
+        """Value to compare against the baseline."""
+        return self.best
+
+    def format(self) -> str:
+        """Format the result for the terminal summary."""
+        return f"{self.best * 1e6:>10.3f} us {self.ops:>14,.0f} ops/s"
+
+
+@dataclass(frozen=True)
+class MemoryResult:
+    name: str
+    number: int
+    size: float
+
+    @property
+    def value(self) -> float:
+        """Value to compare against the baseline."""
+        return self.size
+
+    def format(self) -> str:
+        """Format the result for the terminal summary."""
+        return f"{self.size / 1024:>10.3f} KiB per call"
+
+
+def pytest_configure(config):
+    config.stash[results_key] = []
+    config.stash[regressions_key] = []
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    for item in items:
+        if "benchmarks" in item.path.parts:
+            item.add_marker(pytest.mark.benchmark)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    results = config.stash.get(results_key, [])
+    if path := config.getoption("bench_json"):
+        data = [{"kind": type(result).__name__, **asdict(result)} for result in results]
+        Path(path).write_text(json.dumps({"benchmarks": data}, indent=2))
+    if path := config.getoption("bench_compare"):
+        baseline = _load_baseline(path)
+        max_regression = config.getoption("bench_max_regression")
+        for result in results:
+            if max_regression is None or (previous := baseline.get(result.name)) is None:
+                continue
+            if result.value > previous * (1 + max_regression):
+                config.stash[regressions_key].append(result.name)
+        if config.stash[regressions_key] and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(results_key, [])
+    if not results:
+        return
+    baseline = _load_baseline(path) if (path := config.getoption("bench_compare")) else {}
+    regressions = config.stash.get(regressions_key, [])
+    terminalreporter.section("benchmarks")
+    for result in results:
+        line = f"{result.name:<60} {result.format()}"
+        if previous := baseline.get(result.name):
+            line += f" {(result.value - previous) / previous:>+8.1%}"
+        terminalreporter.write_line(line, red=result.name in regressions)
+    if regressions:
+        max_regression = config.getoption("bench_max_regression")
+        terminalreporter.write_line(f"{len(regressions)} benchmarks regressed by more than {max_regression:.0%}",
+                                    red=True, bold=True)
+
+
+def _load_baseline(path: str) -> dict[str, float]:
+    """Load the values of the benchmarks stored in a baseline file by name."""
+    data = json.loads(Path(path).read_text())
+    return {result["name"]: result["best" if result["kind"] == "BenchmarkResult" else "size"]
+            for result in data["benchmarks"]}
+
+
+@pytest.fixture
+def bench(request):
+    """Measure the best time per call of a function over a few rounds."""
+
+    def run(func: Callable[[], object], *, name: str | None = None, number: int = 1000,
+            repeat: int = 5) -> BenchmarkResult:
+        timings = timeit.repeat(func, number=number, repeat=repeat)
+        result = BenchmarkResult(name or request.node.name, number, min(timings) / number)
+        request.config.stash[results_key].append(result)
+        return result
+
+    return run
+
+
+@pytest.fixture
+def memory_bench(request):
+    """Measure the memory retained per call of a function."""
+
+    def run(func: Callable[[], object], *, name: str | None = None, number: int = 100) -> MemoryResult:
+        retained = []
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            retained.extend(func() for _ in range(number))
+            gc.collect()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        result = MemoryResult(name or request.node.name, number, (after - before) / number)
+        request.config.stash[results_key].append(result)
+        return result
+
+    return run
@@ -0,0 +1,132 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.orm import declarative_base
+
+from indico_patcher.classes import batch_patches
+from indico_patcher.classes import patch_class
+from indico_patcher.classes import patched
+
+# Number of plugins patching the same model at startup
+PLUGINS = 40
+# Number of rounds for benchmarks that need a fresh class per round
+ROUNDS = 5
+
+
+def _create_model():
+    class Fool(declarative_base()):
+        __tablename__ = "fools"
+        id = Column(Integer, primary_key=True)
+
+        def meth(self):
+            pass
+
+    configure_mappers()
+    return Fool
+
+
+def _patch_model(Fool):
+    for idx in range(PLUGINS):
+        @patch_class(Fool)
+        class _Fool:
+            locals()[f"column_{idx}"] = Column(String)
+
+            @property
+            def prop(self):
+                pass
+
+            def meth(self):
+                super().meth()
+
+
+def _create_hierarchy(depth):
+    cls = object
+    for idx in range(depth):
+        cls = type(f"Fool{idx}", (cls,), {"meth": lambda self: None, "attr": idx})
+    return cls
+
+
+def _create_patch(members):
+    source = "\n".join(["class _Fool:"] + [f"    def meth_{idx}(self): return super().meth_{idx}()"
+                                            for idx in range(members)])
+    namespace = {}
+    exec(source, {}, namespace)
+    return namespace["_Fool"]
+
+
+def _startup():
+    _patch_model(_create_model())
+    configure_mappers()
+
+
+def _startup_in_batch():
+    Fool = _create_model()
+    with batch_patches():
+        _patch_model(Fool)
+
+
+def test_bench_startup(bench):
+    bench(_startup, name=f"startup with {PLUGINS} patches one at a time", number=1, repeat=5)
+    bench(_startup_in_batch, name=f"startup with {PLUGINS} patches in a batch", number=1, repeat=5)
+
+
+@pytest.mark.parametrize("members", (1, 10, 100))
+def test_bench_patch_class_members(bench, members):
+    classes = [_create_hierarchy(1) for _ in range(ROUNDS)]
+    patches = [_create_patch(members) for _ in range(ROUNDS)]
+    bench(lambda: patch_class(classes.pop())(patches.pop()), name=f"patch class with {members} members",
+          number=1, repeat=ROUNDS)
+
+
+@pytest.mark.parametrize("depth", (1, 10, 50))
+def test_bench_patch_class_depth(bench, depth):
+    classes = [_create_hierarchy(depth) for _ in range(ROUNDS)]
+
+    def apply():
+        @patch_class(classes.pop())
+        class _Fool:
+            attr = "attr"
+
+            def meth(self):
+                super().meth()
+
+    bench(apply, name=f"patch class with {depth} ancestors", number=1, repeat=ROUNDS)
+
+
+@pytest.mark.parametrize("patches", (0, 10, 40))
+def test_bench_subclass_creation(bench, patches):
+    cls = _create_hierarchy(1)
+    for _ in range(patches):
+        patch_class(cls)(_create_patch(1))
+    bench(lambda: type("Magician", (cls,), {}), name=f"subclass creation with {patches} patches on base")
+
+
+@pytest.mark.parametrize("members", (1, 10, 100))
+def test_bench_patched(bench, members):
+    cls = _create_hierarchy(1)
+    patch = _create_patch(members)
+
+    def apply_and_revert():
+        with patched():
+            patch_class(cls)(patch)
+
+    bench(apply_and_revert, name=f"apply and revert patch with {members} members", number=10)
+
+
+def test_bench_patch_class_memory(memory_bench):
+    members = 10
+    number = 50
+    classes = [_create_hierarchy(1) for _ in range(number)]
+    patches = [_create_patch(members) for _ in range(number)]
+
+    def apply():
+        cls = classes.pop()
+        patch_class(cls)(patches.pop())
+        return cls
+
+    memory_bench(apply, name=f"memory retained by patching {members} methods", number=number)
@@ -0,0 +1,35 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import pytest
+
+from indico_patcher.classes import compile_patches
+from indico_patcher.classes import patch_class
+
+
+def _create_class(depth):
+    class Fool:
+        def meth(self):
+            pass
+
+    for _ in range(depth):
+        @patch_class(Fool)
+        class _Fool:
+            def meth(self):
+                super().meth()
+
+    return Fool
+
+
+def test_bench_unpatched(bench):
+    bench(_create_class(0)().meth, name="call to an unpatched method")
+
+
+@pytest.mark.parametrize("depth", (1, 5, 20))
+def test_bench_stacked_patches(bench, depth):
+    dynamic = _create_class(depth)()
+    Fool = _create_class(depth)
+    compile_patches(Fool)
+    compiled = Fool()
+    bench(dynamic.meth, name=f"call through {depth} stacked patches")
+    bench(compiled.meth, name=f"call through {depth} compiled stacked patches")
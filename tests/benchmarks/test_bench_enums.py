@@ -0,0 +1,91 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from enum import Enum
+
+import pytest
+from aenum import extend_enum
+
+from indico.util.enum import RichIntEnum
+
+from indico_patcher.enums import _extend_enum
+from indico_patcher.enums import cache_by_generation
+from indico_patcher.enums import patch_enum
+
+# Number of rounds for benchmarks that need a fresh enum per round
+ROUNDS = 5
+
+
+def _create_enums(members, rich):
+    base = RichIntEnum if rich else Enum
+
+    class TarotCard(base):
+        __titles__ = ["The Fool", "The Magician"]
+        the_fool = 0
+        the_magician = 1
+
+    _TarotCard = base("_TarotCard", {f"card_{idx}": idx + 2 for idx in range(members)})
+    _TarotCard.__titles__ = [f"Card {idx}" for idx in range(members)]
+    return TarotCard, _TarotCard
+
+
+@pytest.mark.parametrize("rich", (False, True), ids=("enum", "rich"))
+@pytest.mark.parametrize("padding", (0, 1000))
+@pytest.mark.parametrize("members", (10, 100, 1000))
+def test_bench_patch_enum(bench, members, padding, rich):
+    enums = [_create_enums(members, rich) for _ in range(ROUNDS)]
+
+    def apply():
+        TarotCard, _TarotCard = enums.pop()
+        patch_enum(TarotCard, padding=padding)(_TarotCard)
+
+    kind = "rich enum" if rich else "enum"
+    bench(apply, name=f"patch {kind} with {members} members and padding {padding}", number=1, repeat=ROUNDS)
+
+
+@pytest.mark.parametrize("members", (10, 100, 1000))
+def test_bench_extend_enum(bench, members):
+    enums = [_create_enums(0, False)[0] for _ in range(ROUNDS * 2)]
+    new_members = [(f"card_{idx}", idx + 2) for idx in range(members)]
+
+    def extend_per_member():
+        enum = enums.pop()
+        for name, value in new_members:
+            extend_enum(enum, name, value)
+
+    bench(extend_per_member, name=f"extend enum with {members} members one by one", number=1, repeat=ROUNDS)
+    bench(lambda: _extend_enum(enums.pop(), new_members),
+          name=f"extend enum with {members} members at once", number=1, repeat=ROUNDS)
+
+
+@pytest.mark.parametrize("plugins", (10, 100))
+def test_bench_patch_enum_with_auto_padding(bench, plugins):
+    TarotCard = _create_enums(0, False)[0]
+    patches = [Enum(f"_TarotCard{plugin}", {f"card_{plugin}_{idx}": idx for idx in range(1, 11)})
+               for plugin in range(plugins)]
+    bench(lambda: patch_enum(TarotCard, padding="auto")(patches.pop()),
+          name=f"patch enum with auto padding among {plugins} plugins", number=1, repeat=plugins)
+
+
+def test_bench_patch_rich_enum_memory(memory_bench):
+    number = 20
+    enums = [_create_enums(10, True) for _ in range(number)]
+
+    def apply():
+        TarotCard, _TarotCard = enums.pop()
+        patch_enum(TarotCard, padding=10000)(_TarotCard)
+        return TarotCard
+
+    memory_bench(apply, name="memory retained by patching rich enum with padding 10000", number=number)
+
+
+def test_bench_enum_choices(bench):
+    TarotCard, _TarotCard = _create_enums(1000, True)
+    patch_enum(TarotCard)(_TarotCard)
+
+    def get_choices(enum):
+        return sorted(((x.value, x.title) for x in enum), key=lambda choice: str(choice[1]))
+
+    cached_get_choices = cache_by_generation(get_choices)
+    bench(lambda: get_choices(TarotCard), name="choices of enum with 1000 members", number=10)
+    bench(lambda: cached_get_choices(TarotCard), name="cached choices of enum with 1000 members")
@@ -0,0 +1,37 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from indico_patcher import metrics
+from indico_patcher.classes import patch_class
+from indico_patcher.profiling import Profiler
+
+
+def _create_class():
+    class Fool:
+        def meth(self):
+            pass
+
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            super().meth()
+
+    return Fool
+
+
+def test_bench_metrics(bench):
+    plain = _create_class()()
+    metrics.enable()
+    try:
+        instrumented = _create_class()()
+    finally:
+        metrics.disable()
+    bench(plain.meth, name="call to a patched method")
+    bench(instrumented.meth, name="call to an instrumented patched method")
+
+
+def test_bench_profiler(bench):
+    fool = _create_class()()
+    for sample_rate in (1, 0.1):
+        with Profiler(sample_rate=sample_rate):
+            bench(fool.meth, name=f"call to a patched method profiled at {sample_rate:.0%}")
@@ -0,0 +1,163 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy.ext.hybrid import hybrid_method
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from indico_patcher.classes import patch_class
+from indico_patcher.util import Duper
+from indico_patcher.util import SuperProxy
+
+# Module global read in a loop by patched functions
+WEIGHT = 1
+
+
+class LegacySuperProxy(SuperProxy):
+    """SuperProxy creating a new duper class on every call to super()."""
+
+    def __call__(self, patch_class=None, obj=None):
+        class duper(Duper):
+            __slots__ = ()
+
+        return duper(self.orig_class, patch_class, obj)
+
+
+@pytest.fixture
+def Fool():
+    class Fool:
+        def meth(self):
+            pass
+
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            pass
+
+    return Fool
+
+
+def test_bench_super_call(bench, Fool):
+    fool = Fool()
+    _Fool = Fool.__patches__[0]
+    legacy_proxy = LegacySuperProxy(Fool)
+    proxy = SuperProxy(Fool)
+    bench(lambda: legacy_proxy(_Fool, fool).meth(), name="super() call with a class per call")
+    bench(lambda: proxy(_Fool, fool).meth(), name="super() call with a shared duper class")
+
+
+def test_bench_global_lookups(bench):
+    class Juggler:
+        def meth(self):
+            return 0
+
+        def juggle(self):
+            return 0
+
+    @patch_class(Juggler)
+    class _Juggler:
+        def meth(self):
+            total = super().meth()
+            for _ in range(100):
+                total += WEIGHT
+            return total
+
+        def juggle(self):
+            total = super(_Juggler, self).juggle()  # noqa: UP008
+            for _ in range(100):
+                total += WEIGHT
+            return total
+
+    juggler = Juggler()
+    bench(lambda: juggler.juggle(), name="global lookups with super() as a global")
+    bench(lambda: juggler.meth(), name="global lookups with bound super() calls")
+
+
+@pytest.fixture
+def Magician(db_base):
+    class Magician(db_base):
+        __tablename__ = "magicians"
+        id = Column(Integer, primary_key=True)
+
+        @property
+        def prop(self):
+            pass
+
+        @prop.setter
+        def prop(self, value):
+            pass
+
+        @hybrid_property
+        def hprop(self):
+            pass
+
+        @hprop.expression
+        def hprop(cls):
+            return cls.id
+
+        @hybrid_method
+        def hmeth(self, value):
+            return self.id + value
+
+        @staticmethod
+        def smeth():
+            pass
+
+        @classmethod
+        def cmeth(cls):
+            pass
+
+        def meth(self):
+            pass
+
+    @patch_class(Magician)
+    class _Magician:
+        @property
+        def prop(self):
+            return super().prop
+
+        @prop.setter
+        def prop(self, value):
+            super().prop = value
+
+        @hybrid_property
+        def hprop(self):
+            return super().hprop
+
+        @hprop.expression
+        def hprop(cls):
+            return super().hprop
+
+        @hybrid_method
+        def hmeth(self, value):
+            return super().hmeth(value)
+
+        @staticmethod
+        def smeth():
+            super().smeth()
+
+        @classmethod
+        def cmeth(cls):
+            super().cmeth()
+
+        def meth(self):
+            super().meth()
+
+    return Magician
+
+
+def test_bench_super_call_by_member(bench, Magician, db_session):
+    magician = Magician()
+    db_session.add(magician)
+    db_session.flush()
+    bench(lambda: magician.meth(), name="super() call in method")
+    bench(lambda: Magician.cmeth(), name="super() call in classmethod")
+    bench(lambda: Magician.smeth(), name="super() call in staticmethod")
+    bench(lambda: magician.prop, name="super() call in property")
+    bench(lambda: magician.hprop, name="super() call in hybrid property")
+    bench(lambda: setattr(magician, "prop", None), name="super() call in property setter")
+    bench(lambda: Magician.hprop, name="super() call in hybrid property expression")
+    bench(lambda: magician.hmeth(1), name="super() call in hybrid method")
+    bench(lambda: Magician.hmeth(1), name="super() call in hybrid method expression")
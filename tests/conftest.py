@@ -7,6 +7,15 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-json", metavar="PATH", help="Write the results of the benchmarks to a JSON file")
+    group.addoption("--bench-compare", metavar="PATH",
+                    help="Compare the results of the benchmarks to a baseline JSON file")
+    group.addoption("--bench-max-regression", metavar="RATIO", type=float,
+                    help="Fail if a benchmark is slower than the baseline by more than this ratio")
+
+
 @pytest.fixture(scope="session")
 def db_engine():
     return create_engine("sqlite:///:memory:")
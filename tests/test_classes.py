@@ -1,23 +1,47 @@
 # This file is part of indico-patcher.
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
-from collections import defaultdict
+import sys
+import threading
+from functools import cached_property
 from unittest.mock import MagicMock
 from unittest.mock import call
+from unittest.mock import patch
 
 import pytest
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 from sqlalchemy import Integer
 from sqlalchemy import String
+from sqlalchemy import select
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import backref
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.attributes import QueryableAttribute
 from sqlalchemy.sql.elements import ClauseElement
 
+from indico.util.decorators import cached_classproperty
+from indico.util.decorators import classproperty
+from indico.util.decorators import strict_classproperty
+
 from indico_patcher.classes import SKIPPED_MEMBERS
+from indico_patcher.classes import _apply_patches
+from indico_patcher.classes import batch_patches
+from indico_patcher.classes import compile_patches
 from indico_patcher.classes import patch_class
+from indico_patcher.classes import patched
+from indico_patcher.classes import unpatch
+from indico_patcher.registry import PatchRegistry
+from indico_patcher.util import BoundSuperProxy
+from indico_patcher.util import SuperGlobals
+from indico_patcher.util import SuperProxy
+from indico_patcher.util import _get_private_name
+from indico_patcher.util import _resolve_super
+from indico_patcher.util import deferred_indexing
+from indico_patcher.util import patch_lock
 
 
 @pytest.fixture
@@ -41,6 +65,10 @@ def Fool(db_base):
         def hprop(self):
             return "hprop"
 
+        @hybrid_method
+        def hmeth(self, value):
+            return self.id + value
+
         @staticmethod
         def smeth(*args, **kwargs):
             Fool.__probe__(*args, **kwargs)
@@ -111,13 +139,13 @@ def test_patch_class_multiple_times(Fool):
     assert Fool.__patches__ == [_Fool1, _Fool2]
 
     # Test that the original attribute is in the unpatched stack
-    assert Fool.__unpatched__["attributes"]["attr"] == [orig_attr]
+    assert Fool.__unpatched__["attributes"]["attr"] == (orig_attr,)
 
     # Test that the original methods are in the unpatched stack
     unpatched_methods = Fool.__unpatched__["methods"]["meth"]
     assert len(unpatched_methods) == 2
     assert unpatched_methods[0] is orig_meth
-    assert unpatched_methods[1].__code__ is _Fool1.meth.__code__
+    assert unpatched_methods[1].__qualname__ == _Fool1.meth.__qualname__
 
     # Test that the method calls are properly chained through all patches
     Fool().meth()
@@ -149,7 +177,465 @@ def test_subclass_patch_reset(Fool):
     assert Fool.__patches__ == [_Fool]
     # Verify that patch tracking is not injected into the patch class
     assert Magician.__patches__ == []
-    assert Magician.__unpatched__ == defaultdict(lambda: defaultdict(list))
+    assert Magician.__unpatched__ == PatchRegistry()
+
+
+def test_subclass_patch_storage_is_lazy(Fool):
+    init_subclass = Fool.__init_subclass__
+    for _ in range(3):
+        @patch_class(Fool)
+        class _Fool:
+            pass
+
+    class Magician(Fool):
+        pass
+
+    # Verify that subclass creation is not hooked and storage is only created on access
+    assert Fool.__init_subclass__ == init_subclass
+    assert "__patches__" not in Magician.__dict__
+    assert Magician.__patches__ == []
+    assert "__patches__" in Magician.__dict__
+
+    @patch_class(Magician)
+    class _Magician:
+        pass
+
+    # Verify that patching the subclass does not alter the storage of the parent class
+    assert Magician.__patches__ == [_Magician]
+    assert len(Fool.__patches__) == 3
+
+
+@patch.object(SuperProxy, "_get_caller_code", side_effect=AssertionError("frame inspected"))
+@patch.object(SuperProxy, "_get_defaults", side_effect=AssertionError("frame inspected"))
+def test_patch_class_with_super_without_frames(_get_defaults, _get_caller_code, Fool):
+    @patch_class(Fool)
+    class _Fool:
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        @classmethod
+        def cmeth(cls, *args, **kwargs):
+            super().cmeth(*args, **kwargs)
+
+        def meth(self, *args, **kwargs):
+            super().meth(*args, **kwargs)
+
+    fool = Fool()
+    fool.meth("meth")
+    Fool.cmeth("cmeth")
+    assert fool.prop == "_prop"
+    assert Fool.__probe__.call_args_list == [call("meth"), call("cmeth")]
+
+
+@patch.object(SuperProxy, "_get_caller_code", side_effect=AssertionError("frame inspected"))
+@patch.object(SuperProxy, "_get_defaults", side_effect=AssertionError("frame inspected"))
+def test_patch_class_with_super_in_setter_and_deleter_without_frames(_get_defaults, _get_caller_code, Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        @property
+        def prop(self):
+            return self.__dict__.get("_prop", "prop")
+
+        @prop.setter
+        def prop(self, value):
+            self.__dict__["_prop"] = value
+
+        @prop.deleter
+        def prop(self):
+            del self.__dict__["_prop"]
+
+    @patch_class(Fool)
+    class _Fool2:
+        @property
+        def prop(self):
+            return super().prop
+
+        @prop.setter
+        def prop(self, value):
+            super().prop = value.upper()
+
+        @prop.deleter
+        def prop(self):
+            del super().prop
+
+    fool = Fool()
+    fool.prop = "magic"
+    assert fool.prop == "MAGIC"
+    del fool.prop
+    assert fool.prop == "prop"
+    for func in (Fool.prop.fset, Fool.prop.fdel):
+        assert not isinstance(func.__globals__, SuperGlobals)
+
+
+# -- batches -------------------------------------------------------------------
+
+def test_batch_patches(Fool):
+    class Magician(Fool):
+        pass
+
+    with batch_patches():
+        @patch_class(Fool)
+        class _Fool1:
+            attr = "fool1"
+
+            def meth(self, *args):
+                super().meth(*args, "_Fool1")
+
+        @patch_class(Magician)
+        class _Magician:
+            attr = "magician"
+
+        @patch_class(Fool)
+        class _Fool2:
+            def meth(self):
+                super().meth("_Fool2")
+
+        # Verify that patches are not applied until the batch exits
+        assert Fool.attr == "attr"
+        assert Fool.__patches__ == []
+
+    assert Fool.__patches__ == [_Fool1, _Fool2]
+    assert Magician.__patches__ == [_Magician]
+    assert Fool.attr == "fool1"
+    assert Magician.attr == "magician"
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Fool2", "_Fool1")]
+
+
+def test_batch_patches_called_before_indexing(Fool):
+    class _Fool1:
+        def meth(self, *args):
+            super().meth(*args, "_Fool1")
+
+    class _Fool2:
+        def meth(self):
+            super().meth("_Fool2")
+
+    # Verify that members installed in a batch can be called before it is indexed, as from
+    # threads that do not take the lock
+    patch_class(Fool)
+    with patch_lock, deferred_indexing():
+        _apply_patches(Fool, [_Fool1])
+        Fool().meth()
+        _apply_patches(Fool, [_Fool2])
+        Fool().meth()
+
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Fool1"), call("_Fool2", "_Fool1"), call("_Fool2", "_Fool1")]
+
+
+def test_batch_patches_nested(Fool):
+    with batch_patches():
+        with batch_patches():
+            @patch_class(Fool)
+            class _Fool:
+                attr = "fool"
+
+        # Verify that patches of nested batches are applied with the outermost batch
+        assert Fool.attr == "attr"
+
+    assert Fool.attr == "fool"
+
+
+def test_batch_patches_with_exception(Fool):
+    with pytest.raises(RuntimeError), batch_patches():
+        @patch_class(Fool)
+        class _Fool:
+            attr = "fool"
+
+        raise RuntimeError
+
+    assert Fool.attr == "attr"
+    assert Fool.__patches__ == []
+
+
+def test_batch_patches_for_db_column(Fool, db_base, db_session):
+    with batch_patches():
+        @patch_class(Fool)
+        class _Fool:
+            name = Column(String)
+
+    # Recreate tables with new columns
+    connection = db_session.connection()
+    db_base.metadata.drop_all(connection)
+    db_base.metadata.create_all(connection)
+
+    fool = Fool(name="fool")
+    db_session.add(fool)
+    db_session.flush()
+    assert fool.name == "fool"
+    assert Fool.__mapper__.configured
+
+
+# -- compiled patches ----------------------------------------------------------
+
+def test_compile_patches(Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        @classmethod
+        def cmeth(cls, *args):
+            super().cmeth(*args, "_Fool1")
+
+        def meth(self, *args):
+            super().meth(*args, "_Fool1")
+
+    @patch_class(Fool)
+    class _Fool2:
+        @property
+        def prop(self):
+            return f"__{super().prop}"
+
+        def meth(self, *args):
+            super().meth(*args, "_Fool2")
+
+    compile_patches(Fool)
+
+    with patch.object(BoundSuperProxy, "__call__", side_effect=AssertionError("proxy called")):
+        fool = Fool()
+        fool.meth()
+        Fool.cmeth()
+        assert fool.prop == "___prop"
+    assert Fool.__probe__.call_args_list == [call("_Fool2", "_Fool1"), call("_Fool1")]
+    stored = Fool.__unpatched__["methods"]["meth"]
+    assert getattr(Fool, _get_private_name(Fool, "methods", 0, "meth")) is stored[0]
+    assert getattr(Fool, _get_private_name(Fool, "methods", 1, "meth")) is stored[1]
+
+
+def test_compile_patches_for_patched_base_and_subclass(Fool):
+    class Magician(Fool):
+        pass
+
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self, *args):
+            super().meth(*args, "_Fool")
+
+    @patch_class(Magician)
+    class _Magician:
+        def meth(self, *args):
+            super().meth(*args, "_Magician")
+
+    compile_patches(Fool)
+    compile_patches(Magician)
+    Magician().meth()
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Magician", "_Fool"), call("_Fool")]
+
+
+def test_compile_patches_for_classmethod_called_on_subclass():
+    class Fool:
+        @classmethod
+        def cmeth(cls):
+            return cls.__name__
+
+    class Magician(Fool):
+        pass
+
+    @patch_class(Fool)
+    class _Fool:
+        @classmethod
+        def cmeth(cls):
+            return f"p-{super().cmeth()}"
+
+    # Compiling calls to super() does not change the class they are bound to
+    assert (Fool.cmeth(), Magician.cmeth(), Magician().cmeth()) == ("p-Fool", "p-Magician", "p-Magician")
+    compile_patches(Fool)
+    assert (Fool.cmeth(), Magician.cmeth(), Magician().cmeth()) == ("p-Fool", "p-Magician", "p-Magician")
+
+
+def test_compile_patches_then_patch(Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        def meth(self, *args):
+            super().meth(*args, "_Fool1")
+
+    compile_patches(Fool)
+
+    @patch_class(Fool)
+    class _Fool2:
+        def meth(self, *args):
+            super().meth(*args, "_Fool2")
+
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Fool2", "_Fool1")]
+
+
+def test_compile_patches_skips_other_members(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        @hybrid_property
+        def hprop(self):
+            return f"_{super().hprop}"
+
+        def meth(self, *args):
+            super().cmeth(*args, "_Fool")
+
+        def new_meth(self):
+            return super().new_meth
+
+    compile_patches(Fool)
+
+    fool = Fool()
+    fool.meth()
+    assert fool.hprop == "_hprop"
+    assert Fool.__probe__.call_args_list == [call("_Fool")]
+    with pytest.raises(AttributeError):
+        fool.new_meth()
+
+
+def test_compile_patches_for_non_patched_class():
+    class Fool:
+        pass
+
+    with pytest.raises(TypeError):
+        compile_patches(Fool)
+
+
+# -- unpatching ----------------------------------------------------------------
+
+def test_unpatch(Fool):
+    orig_members = {name: Fool.__dict__[name] for name in ("attr", "prop", "hprop", "meth", "cmeth", "smeth")}
+
+    @patch_class(Fool)
+    class _Fool1:
+        attr = "_attr"
+
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        @hybrid_property
+        def hprop(self):
+            return "_hprop"
+
+        @classmethod
+        def cmeth(cls, *args):
+            super().cmeth(*args, "_Fool1")
+
+        @staticmethod
+        def smeth(*args):
+            pass
+
+        def meth(self, *args):
+            super().meth(*args, "_Fool1")
+
+        def spell(self):
+            pass
+
+    @patch_class(Fool)
+    class _Fool2:
+        def meth(self, *args):
+            super().meth(*args, "_Fool2")
+
+    unpatch(Fool)
+
+    assert {name: Fool.__dict__[name] for name in orig_members} == orig_members
+    assert not hasattr(Fool, "spell")
+    for name in ("__patches__", "__unpatched__", "__resolution__"):
+        assert name not in Fool.__dict__
+    Fool().meth()
+    Fool.cmeth()
+    assert Fool.__probe__.call_args_list == [call(), call()]
+
+
+def test_unpatch_inherited_member(Fool):
+    class Magician(Fool):
+        pass
+
+    @patch_class(Magician)
+    class _Magician:
+        def meth(self, *args):
+            super().meth(*args, "_Magician")
+
+    unpatch(Magician)
+
+    assert "meth" not in Magician.__dict__
+    Magician().meth()
+    assert Magician.__probe__.call_args_list == [call()]
+
+
+def test_unpatch_compiled_patches(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self, *args):
+            super().meth(*args, "_Fool")
+
+    compile_patches(Fool)
+    unpatch(Fool)
+
+    assert _get_private_name(Fool, "methods", 0, "meth") not in Fool.__dict__
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call()]
+
+
+def test_unpatch_keeps_db_columns(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        name = Column(String)
+
+    unpatch(Fool)
+
+    assert isinstance(Fool.__dict__["name"], QueryableAttribute)
+
+
+def test_unpatch_for_unpatched_class(Fool):
+    with pytest.raises(TypeError):
+        unpatch(Fool)
+
+
+def test_patched(Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        def meth(self, *args):
+            super().meth(*args, "_Fool1")
+
+    with patched():
+        @patch_class(Fool)
+        class _Fool2:
+            def meth(self, *args):
+                super().meth(*args, "_Fool2")
+
+            def spell(self):
+                pass
+
+        with patched():
+            @patch_class(Fool)
+            class _Fool3:
+                def meth(self, *args):
+                    super().meth(*args, "_Fool3")
+
+        assert Fool.__patches__ == [_Fool1, _Fool2]
+        Fool().meth()
+
+    assert Fool.__patches__ == [_Fool1]
+    assert not hasattr(Fool, "spell")
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Fool2", "_Fool1"), call("_Fool1")]
+
+    # Verify that reverted members can be patched again
+    @patch_class(Fool)
+    class _Fool4:
+        def meth(self, *args):
+            super().meth(*args, "_Fool4")
+
+    Fool.__probe__.reset_mock()
+    Fool().meth()
+    assert Fool.__probe__.call_args_list == [call("_Fool4", "_Fool1")]
+
+
+def test_patched_in_batch(Fool):
+    with patched(), batch_patches():
+        @patch_class(Fool)
+        class _Fool:
+            attr = "_attr"
+
+    assert Fool.attr == "attr"
+    assert "__patches__" not in Fool.__dict__
 
 
 # -- attributes ----------------------------------------------------------------
@@ -259,6 +745,283 @@ def test_patch_class_for_property_with_super_in_subclass(Fool):
     assert magician.prop == "prop-fool-magician-sorcerer"
 
 
+def test_patch_class_for_property_setter_and_deleter_with_super(Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        @property
+        def prop(self):
+            return self.__dict__.get("_prop", "prop")
+
+        @prop.setter
+        def prop(self, value):
+            self.__dict__["_prop"] = value
+
+        @prop.deleter
+        def prop(self):
+            del self.__dict__["_prop"]
+
+    @patch_class(Fool)
+    class _Fool2:
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        @prop.setter
+        def prop(self, value):
+            super().prop = value.upper()
+
+        @prop.deleter
+        def prop(self):
+            self.__probe__("_Fool2")
+            del super().prop
+
+    @patch_class(Fool)
+    class _Fool3:
+        @property
+        def prop(self):
+            return super().prop
+
+        @prop.setter
+        def prop(self, value):
+            super().prop = f"{value}!"
+
+        @prop.deleter
+        def prop(self):
+            self.__probe__("_Fool3")
+            del super().prop
+
+    fool = Fool()
+    fool.prop = "magic"
+    assert fool.prop == "_MAGIC!"
+    del fool.prop
+    assert fool.prop == "_prop"
+    assert fool.__probe__.call_args_list == [call("_Fool3"), call("_Fool2")]
+
+
+def test_patch_class_for_property_setter_with_super_without_setter(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        @property
+        def prop(self):
+            return super().prop
+
+        @prop.setter
+        def prop(self, value):
+            super().prop = value
+
+    with pytest.raises(AttributeError):
+        Fool().prop = "prop"
+
+
+# -- cached properties ---------------------------------------------------------
+
+def test_patch_class_for_new_cached_property(Fool):
+    def cprop(self):
+        return self.__probe__()
+
+    class _Fool:
+        pass
+
+    # Cached properties set after the creation of a class never get their name set
+    _Fool.cprop = cached_property(cprop)
+    patch_class(Fool)(_Fool)
+    fool = Fool()
+    assert fool.cprop is fool.cprop
+    assert fool.__dict__["cprop"] is fool.cprop
+    assert Fool.__probe__.call_count == 1
+
+
+def test_patch_class_for_cached_property_with_super():
+    probe = MagicMock(side_effect=lambda: object())
+
+    class Fool:
+        @cached_property
+        def cprop(self):
+            return [probe()]
+
+    @patch_class(Fool)
+    class _Fool:
+        @cached_property
+        def cprop(self):
+            return [*super().cprop, probe()]
+
+    fool = Fool()
+    assert isinstance(Fool.__dict__["cprop"], cached_property)
+    assert fool.cprop is fool.cprop
+    assert len(fool.cprop) == 2
+    assert probe.call_count == 2
+    assert Fool().cprop != fool.cprop
+    assert probe.call_count == 4
+
+
+def test_patch_class_for_cached_property_over_property(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        @cached_property
+        def prop(self):
+            self.__probe__()
+            return f"{super().prop}!"
+
+    fool = Fool()
+    assert fool.prop == "prop!"
+    assert fool.prop == "prop!"
+    assert Fool.__probe__.call_count == 1
+
+
+# -- class properties ----------------------------------------------------------
+
+def test_patch_class_for_classproperty_with_super():
+    class Fool:
+        @classproperty
+        @classmethod
+        def cprop(cls):
+            return cls.__name__
+
+    class Magician(Fool):
+        pass
+
+    @patch_class(Fool)
+    class _Fool:
+        @classproperty
+        @classmethod
+        def cprop(cls):
+            return f"{super().cprop}!"
+
+    assert isinstance(Fool.__dict__["cprop"], classproperty)
+    assert Fool.cprop == "Fool!"
+    assert Fool().cprop == "Fool!"
+    assert Magician.cprop == "Magician!"
+
+
+def test_patch_class_for_strict_classproperty_with_super():
+    class Fool:
+        @strict_classproperty
+        @staticmethod
+        def cprop():
+            return "cprop"
+
+    @patch_class(Fool)
+    class _Fool:
+        @strict_classproperty
+        @staticmethod
+        def cprop():
+            return f"{super().cprop}!"
+
+    assert isinstance(Fool.__dict__["cprop"], strict_classproperty)
+    assert Fool.cprop == "cprop!"
+    with pytest.raises(AttributeError):
+        Fool().cprop  # noqa: B018
+
+
+def test_patch_class_for_cached_classproperty_with_super():
+    probe = MagicMock(return_value=1)
+
+    class Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return probe(cls)
+
+    class Magician(Fool):
+        pass
+
+    @patch_class(Fool)
+    class _Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return super().cprop + 1
+
+    assert isinstance(Fool.__dict__["cprop"], cached_classproperty)
+    assert (Fool.cprop, Fool.cprop, Magician.cprop, Magician.cprop) == (2, 2, 2, 2)
+    assert probe.call_args_list == [call(Fool), call(Magician)]
+
+
+def test_patch_class_for_cached_classproperty_invalidated():
+    probe = MagicMock(return_value=1)
+
+    class Fool:
+        attr = 1
+
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return probe(cls)
+
+    class Magician(Fool):
+        pass
+
+    @patch_class(Fool)
+    class _Fool1:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return super().cprop + cls.attr
+
+    assert (Fool.cprop, Magician.cprop) == (2, 2)
+    # Values are computed again for the class and its subclasses once patches change
+    @patch_class(Fool)
+    class _Fool2:
+        attr = 10
+
+    assert (Fool.cprop, Magician.cprop) == (11, 11)
+    assert probe.call_count == 4
+    unpatch(Fool)
+    assert (Fool.cprop, Magician.cprop) == (1, 1)
+
+
+def test_patch_class_for_cached_classproperty_read_from_subclass():
+    class Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return f"orig-{cls.__name__}"
+
+    class Magician(Fool):
+        pass
+
+    # Indico stores the value in the subclass it is read from
+    assert Magician.cprop == "orig-Magician"
+    assert "cprop" in Magician.__dict__
+
+    @patch_class(Fool)
+    class _Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return f"patched-{super().cprop}"
+
+    assert "cprop" not in Magician.__dict__
+    assert Magician.cprop == "patched-orig-Magician"
+
+
+def test_patch_class_for_cached_classproperty_overridden_in_subclass():
+    class Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return "orig"
+
+    class Magician(Fool):
+        cprop = "override"
+
+    class Priestess(Magician):
+        pass
+
+    @patch_class(Fool)
+    class _Fool:
+        @cached_classproperty
+        @classmethod
+        def cprop(cls):
+            return f"patched-{super().cprop}"
+
+    # Verify that overrides in subclasses are kept
+    assert Fool.cprop == "patched-orig"
+    assert (Magician.cprop, Priestess.cprop) == ("override", "override")
+    unpatch(Fool)
+    assert Magician.cprop == "override"
+
+
 # -- hybrid properties ---------------------------------------------------------
 
 def test_patch_class_for_hybrid_property(Fool):
@@ -289,6 +1052,184 @@ def test_patch_class_for_hybrid_property_with_super(Fool):
     assert fool.hprop == "hprophprop"
 
 
+def test_patch_class_for_hybrid_property_expression_with_super(Fool, db_session):
+    @patch_class(Fool)
+    class _Fool1:
+        @hybrid_property
+        def hprop(self):
+            return self.id * 10
+
+        @hprop.expression
+        def hprop(cls):
+            return cls.id * 10
+
+    @patch_class(Fool)
+    class _Fool2:
+        @hybrid_property
+        def hprop(self):
+            return super().hprop + 1
+
+        @hprop.expression
+        def hprop(cls):
+            return super().hprop + 1
+
+    fool = Fool(id=4)
+    db_session.add(fool)
+    db_session.flush()
+    assert fool.hprop == 41
+    assert db_session.query(Fool.hprop).scalar() == 41
+
+
+def test_patch_class_for_hybrid_property_expression_hits_compiled_cache(Fool, db_session):
+    @patch_class(Fool)
+    class _Fool1:
+        @hybrid_property
+        def hprop(self):
+            return self.id * 10
+
+        @hprop.expression
+        def hprop(cls):
+            return cls.id * 10
+
+    @patch_class(Fool)
+    class _Fool2:
+        @hybrid_property
+        def hprop(self):
+            return super().hprop + 1
+
+        @hprop.expression
+        def hprop(cls):
+            return super().hprop + 1
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    connection = db_session.connection()
+    results = [connection.execute(select(Fool.id).where(Fool.hprop > 40)) for _ in range(2)]
+    assert [result.scalars().all() for result in results] == [[4], [4]]
+    assert results[1].context.cache_hit == CACHE_HIT
+
+
+def test_patch_class_for_hybrid_property_expression_evaluated_on_access(Fool, db_session):
+    counter = iter(range(10))
+
+    @patch_class(Fool)
+    class _Fool:
+        @hybrid_property
+        def hprop(self):
+            return self.id
+
+        @hprop.expression
+        def hprop(cls):
+            return cls.id + next(counter)
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    # Values computed when building the expression are not frozen
+    values = [db_session.query(Fool.hprop).scalar() for _ in range(3)]
+    assert len(set(values)) == 3
+
+
+def test_patch_class_for_hybrid_property_previous_expression_evaluated_on_access(Fool, db_session):
+    counter = iter(range(10))
+
+    @patch_class(Fool)
+    class _Fool1:
+        @hybrid_property
+        def hprop(self):
+            return self.id
+
+        @hprop.expression
+        def hprop(cls):
+            return cls.id + next(counter)
+
+    @patch_class(Fool)
+    class _Fool2:
+        @hybrid_property
+        def hprop(self):
+            return super().hprop
+
+        @hprop.expression
+        def hprop(cls):
+            return super().hprop
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    # The previous expression looked up through super() is not cached either
+    values = [db_session.query(Fool.hprop).scalar() for _ in range(3)]
+    assert len(set(values)) == 3
+
+
+# -- hybrid methods ------------------------------------------------------------
+
+def test_patch_class_for_hybrid_method(Fool, db_session):
+    @patch_class(Fool)
+    class _Fool:
+        @hybrid_method
+        def hmeth(self, value):
+            return self.id * value
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    fool = db_session.query(Fool).one()
+    assert isinstance(Fool.__dict__["hmeth"], hybrid_method)
+    assert fool.hmeth(2) == 8
+    assert db_session.query(Fool.hmeth(3)).scalar() == 12
+
+
+def test_patch_class_for_hybrid_method_with_super(Fool, db_session):
+    @patch_class(Fool)
+    class _Fool1:
+        @hybrid_method
+        def hmeth(self, value):
+            return super().hmeth(value) * 10
+
+        @hmeth.expression
+        def hmeth(cls, value):
+            return super().hmeth(value) * 10
+
+    @patch_class(Fool)
+    class _Fool2:
+        @hybrid_method
+        def hmeth(self, value):
+            return super().hmeth(value) + 1
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    fool = db_session.query(Fool).one()
+    assert fool.hmeth(1) == 51
+    assert db_session.query(Fool.hmeth(1)).scalar() == 51
+    assert db_session.query(aliased(Fool).hmeth(2)).scalar() == 61
+
+
+def test_patch_class_for_hybrid_method_expression_cached(Fool, db_session):
+    @patch_class(Fool)
+    class _Fool:
+        @hybrid_method
+        def hmeth(self, value):
+            return super().hmeth(value) + 1
+
+    db_session.add(Fool(id=4))
+    db_session.flush()
+    with patch("indico_patcher.util._resolve_super", wraps=_resolve_super) as resolve_super:
+        assert db_session.query(Fool.hmeth(1)).scalar() == 6
+        assert db_session.query(Fool.hmeth(2)).scalar() == 7
+    # The previous expression is only resolved on the first call for the class
+    assert resolve_super.call_count == 1
+
+
+def test_unpatch_hybrid_method(Fool):
+    orig_hmeth = Fool.__dict__["hmeth"]
+
+    @patch_class(Fool)
+    class _Fool:
+        @hybrid_method
+        def hmeth(self, value):
+            return super().hmeth(value) + 1
+
+    unpatch(Fool)
+    assert Fool.__dict__["hmeth"] is orig_hmeth
+
+
 # -- methods -------------------------------------------------------------------
 
 def test_patch_class_for_method(Fool):
@@ -540,6 +1481,68 @@ def test_patch_class_for_staticmethod_with_super_in_subclass(Fool):
     assert Magician.__probe__.call_args_list == [call("Caller"), call("_Magician"), call("Magician"), call("_Fool")]
 
 
+# -- threads -------------------------------------------------------------------
+
+def test_patch_class_from_threads():
+    class Fool:
+        def meth(self):
+            return ["Fool"]
+
+    class Magician(Fool):
+        pass
+
+    threads = 8
+    patches = 20
+    barrier = threading.Barrier(threads * 2)
+    results = []
+    errors = []
+
+    def apply(thread):
+        barrier.wait()
+        for idx in range(patches):
+            name = f"_Fool{thread}_{idx}"
+
+            @patch_class(Fool)
+            class _Fool:
+                __qualname__ = name
+
+                def meth(self, name=name):
+                    return [*super().meth(), name]
+
+            # Subclasses get their own patch tracking storage even if created concurrently
+            @patch_class(Magician)
+            class _Magician:
+                pass
+
+    def call():
+        barrier.wait()
+        for _ in range(threads * patches):
+            try:
+                results.append(Fool().meth())
+            except Exception as exc:
+                errors.append(exc)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [threading.Thread(target=target, args=args)
+                   for idx in range(threads) for target, args in ((apply, (idx,)), (call, ()))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+    # Every call sees the patches applied up to some point, in the order they were applied
+    applied = [patch_class.__qualname__ for patch_class in Fool.__patches__]
+    assert len(applied) == threads * patches
+    assert all(result == ["Fool", *applied[:len(result) - 1]] for result in results)
+    assert Fool().meth() == ["Fool", *applied]
+    assert len(Magician.__patches__) == threads * patches
+
+
 # -- SQLAlchemy ----------------------------------------------------------------
 
 def test_patch_class_for_db_column(Fool, db_base, db_session):
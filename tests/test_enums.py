@@ -2,12 +2,22 @@
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
 from enum import Enum
+from enum import Flag
+from unittest.mock import patch
 
 import pytest
 from pytest import raises
 
 from indico.util.enum import RichIntEnum
 
+from indico_patcher import enums
+from indico_patcher.enums import AUTO_PADDING_STEP
+from indico_patcher.enums import Reservation
+from indico_patcher.enums import RichValues
+from indico_patcher.enums import _extend_enum
+from indico_patcher.enums import cache_by_generation
+from indico_patcher.enums import get_generation
+from indico_patcher.enums import get_reservations
 from indico_patcher.enums import patch_enum
 
 
@@ -122,6 +132,69 @@ def test_patch_richenum_with_padding(RichTarotCard):
     assert RichTarotCard.the_two_of_wands.arcana == Arcana.minor
 
 
+def test_patch_richenum_with_large_padding(RichTarotCard):
+    @patch_enum(RichTarotCard, padding=10000)
+    class _TarotCard(Enum):
+        __titles__ = [None, "The One of Wands"]
+        the_one_of_wands = 1
+
+    assert RichTarotCard.the_one_of_wands.title == "The One of Wands"
+    assert RichTarotCard.the_fool.title == "The Fool"
+    assert isinstance(RichTarotCard.__titles__, RichValues)
+    assert len(RichTarotCard.__titles__) == 10002
+    assert RichTarotCard.__titles__[5000] is None
+    # Verify that padding is not stored
+    assert RichTarotCard.__titles__._sparse == {10001: "The One of Wands"}
+
+
+def test_patch_richenum_multiple_times_with_padding(RichTarotCard):
+    @patch_enum(RichTarotCard, padding=100)
+    class _TarotCardA(Enum):
+        __titles__ = [None, "The One of Wands"]
+        the_one_of_wands = 1
+
+    @patch_enum(RichTarotCard, padding=200)
+    class _TarotCardB(Enum):
+        __titles__ = [None, "The One of Cups"]
+        the_one_of_cups = 1
+
+    assert RichTarotCard.the_one_of_wands.title == "The One of Wands"
+    assert RichTarotCard.the_one_of_cups.title == "The One of Cups"
+    assert RichTarotCard.the_fool.title == "The Fool"
+    assert len(RichTarotCard.__titles__) == 202
+
+
+def test_rich_values():
+    values = RichValues(["a", "b"]).extended(5, [None, "f"]) + ["g"]
+    assert len(values) == 8
+    assert values == ["a", "b", None, None, None, None, "f", "g"]
+    assert list(values) == ["a", "b", None, None, None, None, "f", "g"]
+    assert values[1] == "b"
+    assert values[6] == "f"
+    assert values[-1] == "g"
+    assert values[3] is None
+    assert values[1:4] == ["b", None, None]
+    with raises(IndexError):
+        values[8]
+    with raises(ValueError):
+        values.extended(3, ["x"])
+
+
+def test_rich_values_added_to_list():
+    values = ["x"] + RichValues(["a"]).extended(3, ["d"])
+    assert isinstance(values, RichValues)
+    assert values == ["x", "a", None, None, "d"]
+    assert values._sparse == {4: "d"}
+
+
+def test_rich_values_without_padding():
+    values = RichValues(["a"]).extended(1, ["b"])
+    assert values._dense == ["a", "b"]
+    assert values._sparse == {}
+    assert values != ["a"]
+    assert not RichValues()
+
+
 def test_patch_enum_with_extra_attrs(RichTarotCard):
     @patch_enum(RichTarotCard, extra_attrs=("__deck__", "__meanings__",))
     class _TarotCard(Enum):
@@ -141,3 +214,239 @@ def test_patch_enum_with_extra_attrs_collision(RichTarotCard):
         @patch_enum(RichTarotCard, extra_attrs=("__titles__",))
         class _TarotCard(Enum):
             pass
+
+
+def test_patch_enum_in_bulk(TarotCard):
+    with patch.object(enums, "extend_enum", side_effect=AssertionError("extended per member")):
+        @patch_enum(TarotCard)
+        class _TarotCard(Enum):
+            the_empress = 3
+            the_emperor = 4
+
+    assert list(TarotCard) == [TarotCard.the_fool, TarotCard.the_magician, TarotCard.the_high_priestess,
+                               TarotCard.the_empress, TarotCard.the_emperor]
+    assert TarotCard(3) is TarotCard.the_empress
+    assert TarotCard["the_emperor"] is TarotCard.the_emperor
+    assert TarotCard.the_emperor.name == "the_emperor"
+    assert TarotCard.the_emperor._sort_order_ == 4
+    assert isinstance(TarotCard.the_emperor, TarotCard)
+    assert len(TarotCard) == 5
+
+
+def test_patch_enum_in_bulk_with_aliases(TarotCard):
+    @patch_enum(TarotCard)
+    class _TarotCard(Enum):
+        the_empress = 3
+        the_jester = 0
+
+    assert TarotCard.the_jester is TarotCard.the_fool
+    assert list(TarotCard) == [TarotCard.the_fool, TarotCard.the_magician, TarotCard.the_high_priestess,
+                               TarotCard.the_empress]
+    assert TarotCard.__members__["the_jester"] is TarotCard.the_fool
+
+
+def test_extend_enum_with_aliases(TarotCard):
+    _extend_enum(TarotCard, [("the_empress", 3), ("the_jester", 0)])
+
+    assert TarotCard.the_jester is TarotCard.the_fool
+    assert list(TarotCard) == [TarotCard.the_fool, TarotCard.the_magician, TarotCard.the_high_priestess,
+                               TarotCard.the_empress]
+    assert TarotCard.__members__["the_jester"] is TarotCard.the_fool
+
+
+def test_patch_enum_in_bulk_for_richenum(RichTarotCard):
+    @patch_enum(RichTarotCard)
+    class _TarotCard(Enum):
+        __titles__ = ["The Empress"]
+        the_empress = 3
+
+    assert RichTarotCard(3) is RichTarotCard.the_empress
+    assert RichTarotCard.the_empress == 3
+    assert RichTarotCard.the_empress.title == "The Empress"
+
+
+def test_patch_enum_in_bulk_with_name_collision(TarotCard):
+    with raises(TypeError):
+        @patch_enum(TarotCard)
+        class _TarotCard(Enum):
+            the_empress = 3
+            the_fool = 4
+
+    # Verify that no member was added before the collision was detected
+    assert len(TarotCard) == 3
+    assert not hasattr(TarotCard, "the_empress")
+
+
+def test_patch_enum_for_flag():
+    class Suit(Flag):
+        wands = 1
+        cups = 2
+
+    @patch_enum(Suit)
+    class _Suit(Flag):
+        swords = 4
+        pentacles = 8
+
+    assert Suit.wands | Suit.swords == Suit(5)
+    assert Suit.pentacles.value == 8
+
+
+
+def test_patch_enum_reserves_values(TarotCard):
+    @patch_enum(TarotCard, padding=100)
+    class _TarotCard(Enum):
+        the_one_of_wands = 1
+        the_ten_of_wands = 10
+
+    assert get_reservations(TarotCard) == [
+        Reservation(0, 3, f"{__name__}.{TarotCard.__qualname__}"),
+        Reservation(101, 111, f"{__name__}.test_patch_enum_reserves_values.<locals>._TarotCard"),
+    ]
+
+
+def test_patch_enum_with_reserved_values(TarotCard):
+    @patch_enum(TarotCard, padding=100)
+    class _TarotCardA(Enum):
+        the_one_of_wands = 1
+        the_ten_of_wands = 10
+
+    with raises(ValueError, match="Values 105-105 .* collide with values 101-110"):
+        @patch_enum(TarotCard, padding=100)
+        class _TarotCardB(Enum):
+            the_five_of_cups = 5
+
+    # Verify that nothing was patched nor reserved
+    assert not hasattr(TarotCard, "the_five_of_cups")
+    assert len(get_reservations(TarotCard)) == 2
+
+
+def test_patch_enum_with_values_of_another_patch(TarotCard):
+    @patch_enum(TarotCard, padding=100)
+    class _TarotCardA(Enum):
+        the_one_of_wands = 1
+        the_two_of_wands = 2
+
+    with raises(ValueError, match="Values 101-102 .* collide with values 101-102"):
+        @patch_enum(TarotCard, padding=100)
+        class _TarotCardB(Enum):
+            the_one_of_cups = 1
+            the_two_of_cups = 2
+
+    # Verify that values of other patches are not aliased
+    assert not hasattr(TarotCard, "the_one_of_cups")
+
+
+def test_patch_enum_with_values_of_original_enum(TarotCard):
+    @patch_enum(TarotCard)
+    class _TarotCard(Enum):
+        the_jester = 2
+
+    # Verify that the value is aliased and not reserved again
+    assert TarotCard.the_jester is TarotCard.the_high_priestess
+    assert len(get_reservations(TarotCard)) == 1
+
+
+def test_patch_enum_with_values_between_original_values():
+    class Gappy(Enum):
+        a = 1
+        b = 2
+        c = 100
+
+    @patch_enum(Gappy)
+    class _Gappy(Enum):
+        d = 50
+
+    assert Gappy.d.value == 50
+    assert get_reservations(Gappy) == [
+        Reservation(1, 3, f"{__name__}.{Gappy.__qualname__}"),
+        Reservation(50, 51, f"{__name__}.test_patch_enum_with_values_between_original_values.<locals>._Gappy"),
+        Reservation(100, 101, f"{__name__}.{Gappy.__qualname__}"),
+    ]
+
+
+def test_patch_enum_with_values_across_original_values():
+    class Gappy(Enum):
+        a = 1
+        c = 100
+
+    with raises(ValueError, match="Values 50-150 .* collide with values 100-100"):
+        @patch_enum(Gappy)
+        class _Gappy(Enum):
+            b = 50
+            d = 150
+
+
+def test_patch_enum_with_auto_padding(TarotCard):
+    @patch_enum(TarotCard, padding="auto")
+    class _TarotCardA(Enum):
+        the_empress = 3
+
+    @patch_enum(TarotCard, padding="auto")
+    class _TarotCardB(Enum):
+        the_one_of_wands = 1
+        the_ten_of_wands = 10
+
+    @patch_enum(TarotCard, padding=AUTO_PADDING_STEP + 10)
+    class _TarotCardC(Enum):
+        the_one_of_cups = 1
+
+    @patch_enum(TarotCard, padding="auto")
+    class _TarotCardD(Enum):
+        the_one_of_swords = 1
+
+    # Verify that the padding is the lowest multiple of the step avoiding reserved values
+    assert TarotCard.the_empress.value == 3
+    assert TarotCard.the_one_of_wands.value == AUTO_PADDING_STEP + 1
+    assert TarotCard.the_one_of_cups.value == AUTO_PADDING_STEP + 11
+    assert TarotCard.the_one_of_swords.value == 2 * AUTO_PADDING_STEP + 1
+
+
+def test_patch_richenum_with_auto_padding(RichTarotCard):
+    @patch_enum(RichTarotCard, padding="auto")
+    class _TarotCard(Enum):
+        __titles__ = [None, "The One of Wands"]
+        the_one_of_wands = 1
+
+    assert RichTarotCard.the_one_of_wands.value == AUTO_PADDING_STEP + 1
+    assert RichTarotCard.the_one_of_wands.title == "The One of Wands"
+
+
+def test_patch_enum_generation(TarotCard):
+    assert get_generation(TarotCard) == 0
+
+    @patch_enum(TarotCard)
+    class _TarotCardA(Enum):
+        the_empress = 3
+
+    @patch_enum(TarotCard)
+    class _TarotCardB(Enum):
+        the_emperor = 4
+
+    assert get_generation(TarotCard) == 2
+    assert get_generation(Arcana) == 0
+
+
+def test_cache_by_generation(TarotCard):
+    calls = []
+
+    @cache_by_generation
+    def get_choices(enum, reverse=False):
+        calls.append(reverse)
+        return sorted((x.value, x.name) for x in enum)[::-1 if reverse else 1]
+
+    assert get_choices(TarotCard) == [(0, "the_fool"), (1, "the_magician"), (2, "the_high_priestess")]
+    assert get_choices(TarotCard) is get_choices(TarotCard)
+    assert get_choices(TarotCard, reverse=True)[0] == (2, "the_high_priestess")
+    assert calls == [False, True]
+
+    @patch_enum(TarotCard)
+    class _TarotCard(Enum):
+        the_empress = 3
+
+    # Verify that results are recomputed once after the enum is patched
+    assert get_choices(TarotCard)[-1] == (3, "the_empress")
+    assert get_choices(TarotCard)[-1] == (3, "the_empress")
+    assert calls == [False, True, False]
+    get_choices.cache_clear()
+    get_choices(TarotCard)
+    assert calls == [False, True, False, False]
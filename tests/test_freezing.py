@@ -0,0 +1,140 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import weakref
+from enum import Enum
+from unittest.mock import patch
+
+import pytest
+
+from indico_patcher import classes
+from indico_patcher import freezing
+from indico_patcher import lazy
+from indico_patcher.classes import compile_patches
+from indico_patcher.classes import patch_class
+from indico_patcher.classes import patched
+from indico_patcher.classes import unpatch
+from indico_patcher.enums import patch_enum
+from indico_patcher.freezing import freeze
+from indico_patcher.freezing import is_frozen
+from indico_patcher.util import BoundSuperProxy
+
+
+@pytest.fixture(autouse=True)
+def unfrozen(monkeypatch):
+    # Only freeze the classes patched in each test
+    monkeypatch.setattr(freezing, "_frozen", False)
+    monkeypatch.setattr(classes, "_patched_classes", weakref.WeakSet())
+
+
+@pytest.fixture
+def Fool():
+    class Fool:
+        def meth(self):
+            return "meth"
+
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            return f"_{super().meth()}"
+
+    return Fool
+
+
+def test_freeze(Fool):
+    freeze()
+
+    assert is_frozen()
+    assert Fool.__unpatched__.frozen
+    # Verify that calls to super() were compiled
+    with patch.object(BoundSuperProxy, "__call__", side_effect=AssertionError("proxy called")):
+        assert Fool().meth() == "_meth"
+    with pytest.raises(RuntimeError):
+        Fool.__unpatched__.add("methods", "meth", None)
+
+
+def test_freeze_makes_storage_read_only(Fool):
+    freeze()
+
+    assert Fool.__patches__ == (Fool.__patches__[0],)
+    with pytest.raises(TypeError):
+        Fool.__resolution__["meth", None] = None
+
+
+def test_freeze_for_subclasses(Fool):
+    class Magician(Fool):
+        pass
+
+    freeze()
+
+    assert not Magician.__patches__
+    assert "__patches__" not in Magician.__dict__
+
+
+def test_freeze_for_patched_base_and_subclass(Fool):
+    class Magician(Fool):
+        pass
+
+    @patch_class(Magician)
+    class _Magician:
+        def meth(self):
+            return f"!{super().meth()}"
+
+    freeze()
+
+    assert Magician().meth() == "!_meth"
+    assert Fool().meth() == "_meth"
+
+
+def test_freeze_without_compiling(Fool):
+    code = Fool.meth.__code__
+    freeze(compile_super=False)
+
+    assert Fool.meth.__code__ is code
+    assert Fool().meth() == "_meth"
+
+
+def test_freeze_refuses_patches(Fool):
+    class Enumeration(Enum):
+        a = 1
+
+    freeze()
+
+    with pytest.raises(RuntimeError):
+        @patch_class(Fool)
+        class _Fool:
+            pass
+
+    with pytest.raises(RuntimeError):
+        @patch_enum(Enumeration)
+        class _Enumeration(Enum):
+            b = 2
+
+    with pytest.raises(RuntimeError):
+        @lazy.patch_lazy("indico.modules.fools:Fool", patch_class)
+        class _LazyFool:
+            pass
+
+    assert "indico.modules.fools" not in lazy.get_pending_modules()
+
+    with pytest.raises(RuntimeError):
+        unpatch(Fool)
+    with pytest.raises(RuntimeError):
+        compile_patches(Fool)
+
+
+def test_freeze_refuses_reverting_patches(Fool):
+    with pytest.raises(RuntimeError), patched():
+        @patch_class(Fool)
+        class _Fool:
+            attr = "attr"
+
+        freeze()
+    assert Fool.attr == "attr"
+
+
+def test_freeze_with_pending_patches(monkeypatch):
+    monkeypatch.setattr(lazy, "_pending", {"indico.modules.fools": []})
+    with pytest.raises(RuntimeError):
+        freeze()
+    assert not is_frozen()
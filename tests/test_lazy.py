@@ -0,0 +1,168 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import importlib
+import sys
+import threading
+from enum import Enum
+from importlib.machinery import ModuleSpec
+from textwrap import dedent
+
+import pytest
+
+from indico_patcher.lazy import _finder
+from indico_patcher.lazy import _pending
+from indico_patcher.main import patch
+from indico_patcher.util import patch_lock
+
+
+@pytest.fixture
+def tarot(tmp_path, monkeypatch):
+    (tmp_path / "tarot.py").write_text(dedent("""
+        from enum import Enum
+
+
+        class Fool:
+            def meth(self):
+                return "fool"
+
+            class Card:
+                attr = "card"
+
+
+        class TarotCard(Enum):
+            the_fool = 0
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "tarot"
+    sys.modules.pop("tarot", None)
+    _pending.clear()
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+
+
+def test_patch_lazy(tarot):
+    @patch(f"{tarot}:Fool")
+    class _Fool:
+        def meth(self):
+            return f"_{super().meth()}"
+
+    # Verify that the target module is not imported to patch it
+    assert tarot not in sys.modules
+    assert _finder in sys.meta_path
+
+    module = importlib.import_module(tarot)
+    assert module.Fool.__patches__ == [_Fool]
+    assert module.Fool().meth() == "_fool"
+    # Verify that the import hook is removed once there are no pending patches
+    assert _finder not in sys.meta_path
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+
+
+def test_patch_lazy_in_order(tarot):
+    @patch(f"{tarot}:Fool")
+    class _Fool1:
+        def meth(self):
+            return f"1{super().meth()}"
+
+    @patch(f"{tarot}:Fool.Card")
+    class _Card:
+        attr = "_card"
+
+    @patch(f"{tarot}:Fool")
+    class _Fool2:
+        def meth(self):
+            return f"2{super().meth()}"
+
+    module = importlib.import_module(tarot)
+    assert module.Fool.__patches__ == [_Fool1, _Fool2]
+    assert module.Fool().meth() == "21fool"
+    assert module.Fool.Card.attr == "_card"
+
+
+def test_patch_lazy_for_imported_module(tarot):
+    module = importlib.import_module(tarot)
+
+    @patch(f"{tarot}:Fool")
+    class _Fool:
+        attr = "_fool"
+
+    assert module.Fool.attr == "_fool"
+    assert _finder not in sys.meta_path
+
+
+@pytest.mark.parametrize("pending", (False, True))
+def test_patch_lazy_for_circular_import(tmp_path, monkeypatch, tarot, pending):
+    (tmp_path / "reading.py").write_text(dedent(f"""
+        import sys
+
+        import {tarot}
+        from indico_patcher.main import patch
+
+
+        @patch("{tarot}:Fool")
+        class _Fool:
+            def meth(self):
+                return f"_{{super().meth()}}"
+
+
+        spec_class = type(sys.modules["{tarot}"].__spec__)
+    """))
+    # Import the module patching the target before defining its classes
+    path = tmp_path / f"{tarot}.py"
+    path.write_text(f"import reading\n{path.read_text()}")
+    monkeypatch.delitem(sys.modules, "reading", raising=False)
+    if pending:
+        @patch(f"{tarot}:Fool.Card")
+        class _Card:
+            attr = "_card"
+
+    # Verify that the module being initialized is patched once it is
+    module = importlib.import_module(tarot)
+    assert module.Fool().meth() == "_fool"
+    assert module.Fool.Card.attr == ("_card" if pending else "card")
+    assert not _pending
+    assert type(module.__spec__) is ModuleSpec
+    # Modules loaded through the import hook are patched by it without watching their spec
+    assert (sys.modules["reading"].spec_class is ModuleSpec) == pending
+
+
+def test_patch_lazy_holds_patch_lock(tarot):
+    def register():
+        @patch(f"{tarot}:Fool")
+        class _Fool:
+            attr = "_fool"
+
+    # Verify that patches are neither registered nor applied while patching from another thread
+    with patch_lock:
+        thread = threading.Thread(target=register)
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+        assert not _pending
+    thread.join()
+    assert tarot in _pending
+
+    with patch_lock:
+        thread = threading.Thread(target=importlib.import_module, args=(tarot,))
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+        assert tarot in _pending
+    thread.join()
+    assert sys.modules[tarot].Fool.attr == "_fool"
+
+
+def test_patch_lazy_for_enum(tarot):
+    @patch(f"{tarot}:TarotCard", padding=10)
+    class _TarotCard(Enum):
+        the_magician = 1
+
+    module = importlib.import_module(tarot)
+    assert module.TarotCard.the_magician.value == 11
+
+
+@pytest.mark.parametrize("target", ("tarot", "tarot:", ":Fool"))
+def test_patch_lazy_for_invalid_target(target):
+    with pytest.raises(ValueError):
+        patch(target)
@@ -23,3 +23,9 @@ def test_patch_for_enum(patch_enum):
 
     patch(TarotCard, padding=22, rich_attrs=("__arcana__",))
     patch_enum.assert_called_once_with(TarotCard, padding=22, rich_attrs=("__arcana__",))
+
+
+@mock.patch("indico_patcher.main.patch_lazy")
+def test_patch_for_import_path(patch_lazy):
+    patch("indico.modules.events.models.events:Event")
+    assert patch_lazy.call_args.args[0] == "indico.modules.events.models.events:Event"
@@ -0,0 +1,164 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from unittest.mock import patch
+
+import pytest
+
+from indico_patcher import metrics
+from indico_patcher.classes import compile_patches
+from indico_patcher.classes import patch_class
+from indico_patcher.classes import patched
+from indico_patcher.classes import unpatch
+
+
+@pytest.fixture
+def enabled():
+    metrics.enable()
+    yield
+    metrics.disable()
+
+
+@pytest.fixture
+def Fool():
+    class Fool:
+        @property
+        def prop(self):
+            return "prop"
+
+        @classmethod
+        def cmeth(cls):
+            return "cmeth"
+
+        def meth(self):
+            return "meth"
+
+    return Fool
+
+
+def _get_stats(cls):
+    return {(stats.member_name, stats.patch_class): stats for stats in metrics.snapshot() if stats.orig_class is cls}
+
+
+def test_metrics_disabled(Fool):
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            return f"_{super().meth()}"
+
+    assert Fool().meth() == "_meth"
+    assert not hasattr(Fool.meth, "__instrumented__")
+    assert _get_stats(Fool) == {}
+
+
+def test_metrics_enabled(enabled, Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        @classmethod
+        def cmeth(cls):
+            return f"_{super().cmeth()}"
+
+        def meth(self):
+            return f"_{super().meth()}"
+
+    @patch_class(Fool)
+    class _Fool2:
+        def meth(self):
+            return f"_{super().meth()}"
+
+    fool = Fool()
+    assert fool.meth() == "__meth"
+    assert fool.meth() == "__meth"
+    assert fool.prop == "_prop"
+    assert Fool.cmeth() == "_cmeth"
+    stats = _get_stats(Fool)
+    assert stats["meth", _Fool1].count == 2
+    assert stats["meth", _Fool2].count == 2
+    assert stats["prop", _Fool1].count == 1
+    assert stats["cmeth", _Fool1].count == 1
+    assert stats["meth", _Fool2].buckets[-1] == 2
+    assert stats["meth", _Fool2].total >= stats["meth", _Fool1].total > 0
+
+
+def test_metrics_with_compiled_patches(enabled, Fool):
+    for _ in range(2):
+        @patch_class(Fool)
+        class _Fool:
+            def meth(self):
+                return f"_{super().meth()}"
+
+    compile_patches(Fool)
+
+    assert Fool().meth() == "__meth"
+    assert [stats.count for stats in _get_stats(Fool).values()] == [1, 1]
+
+
+def test_metrics_with_exception(enabled, Fool):
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        Fool().meth()
+    assert _get_stats(Fool)["meth", _Fool].count == 1
+
+
+def test_metrics_reset(enabled, Fool):
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            pass
+
+    Fool().meth()
+    metrics.reset()
+    stats = _get_stats(Fool)["meth", _Fool]
+    assert (stats.count, stats.total, stats.buckets) == (0, 0, (0,) * len(metrics.BUCKETS))
+
+
+def test_metrics_after_unpatching(enabled, Fool):
+    @patch_class(Fool)
+    class _Fool1:
+        def meth(self):
+            pass
+
+    with patched():
+        @patch_class(Fool)
+        class _Fool2:
+            def meth(self):
+                pass
+
+    assert list(_get_stats(Fool)) == [("meth", _Fool1)]
+    unpatch(Fool)
+    assert _get_stats(Fool) == {}
+
+
+def test_write_prometheus(enabled, Fool, tmp_path):
+    @patch_class(Fool)
+    class _Fool:
+        def meth(self):
+            pass
+
+    path = tmp_path / "metrics.prom"
+    with patch.object(metrics, "perf_counter", side_effect=[0, 5e-6, 0, 5e-5]):
+        Fool().meth()
+        Fool().meth()
+    metrics.write_prometheus(path)
+
+    labels = (f'class="{Fool.__module__}.{Fool.__qualname__}",member="meth",'
+              f'patch="{_Fool.__module__}.{_Fool.__qualname__}"')
+    lines = path.read_text().splitlines()
+    assert lines[:2] == [
+        "# HELP indico_patcher_call_duration_seconds Latency of calls to patched members.",
+        "# TYPE indico_patcher_call_duration_seconds histogram",
+    ]
+    assert f'indico_patcher_call_duration_seconds_bucket{{{labels},le="1e-05"}} 1' in lines
+    assert f'indico_patcher_call_duration_seconds_bucket{{{labels},le="0.0001"}} 2' in lines
+    assert f'indico_patcher_call_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"indico_patcher_call_duration_seconds_sum{{{labels}}} 5.5e-05" in lines
+    assert f"indico_patcher_call_duration_seconds_count{{{labels}}} 2" in lines
+    assert not list(tmp_path.glob(".*.tmp"))
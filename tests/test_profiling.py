@@ -0,0 +1,142 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+from unittest.mock import patch
+
+import pytest
+
+from indico_patcher import profiling
+from indico_patcher.classes import patch_class
+from indico_patcher.profiling import Profiler
+from indico_patcher.profiling import ProfileReport
+
+
+@pytest.fixture
+def Fool():
+    class Fool:
+        @property
+        def prop(self):
+            return "prop"
+
+        def meth(self):
+            return "meth"
+
+        def gen(self):
+            yield "gen"
+
+        def fail(self):
+            raise RuntimeError
+
+    @patch_class(Fool)
+    class _Fool:
+        @property
+        def prop(self):
+            return f"_{super().prop}"
+
+        def meth(self):
+            return f"_{super().meth()}"
+
+        def gen(self):
+            yield from super().gen()
+            yield "_gen"
+
+        def fail(self):
+            super().fail()
+
+    return Fool
+
+
+@pytest.fixture
+def clock():
+    ticks = iter(range(1000))
+    with patch.object(profiling, "perf_counter", side_effect=lambda: next(ticks)):
+        yield
+
+
+def test_profiler(Fool, clock):
+    fool = Fool()
+    meth = Fool.__dict__["meth"]
+    with Profiler() as profiler:
+        with profiler.request():
+            assert fool.meth() == "_meth"
+            assert fool.prop == "_prop"
+
+    report = profiler.report()
+    # Verify that functions installed in the class are left as is
+    assert Fool.__dict__["meth"] is meth
+    assert (report.requests, report.calls, report.samples) == (1, 2, 2)
+    member = f"{Fool.__module__}.{Fool.__qualname__}.meth"
+    # The clock ticks once per monitored event: the patched method enters and leaves two
+    # super() lookups (the proxy call and the duper attribute lookup) and the original method
+    assert report.members[member] == {"patch": 4, "super": 4, "original": 1}
+    assert report.times == {"patch": 7, "super": 9, "original": 2}
+    assert report.per_request() == {"patch": 7, "original": 2, "super": 9}
+    assert report.overhead_per_request == 16
+
+
+def test_profiler_with_generator(Fool):
+    with Profiler() as profiler:
+        assert list(Fool().gen()) == ["gen", "_gen"]
+
+    assert profiler.report().calls == 3
+    assert profiler._get_stack() == []
+
+
+def test_profiler_with_exception(Fool):
+    with Profiler() as profiler:
+        with pytest.raises(RuntimeError):
+            Fool().fail()
+        assert Fool().meth() == "_meth"
+
+    assert profiler.report().calls == 2
+    assert profiler._get_stack() == []
+
+
+def test_profiler_stopped(Fool):
+    with Profiler() as profiler:
+        Fool().meth()
+    Fool().meth()
+    profiler.stop()
+
+    assert profiler.report().calls == 1
+
+
+def test_profiler_sampling(Fool):
+    with patch.object(profiling, "random", side_effect=[0.9, 0.1, 0.9, 0.9]), Profiler(sample_rate=0.5) as profiler:
+        for _ in range(4):
+            with profiler.request():
+                Fool().meth()
+
+    report = profiler.report()
+    assert (report.requests, report.calls, report.samples) == (4, 4, 1)
+    # Sampled times are scaled to all calls
+    assert report.per_request()["patch"] == pytest.approx(report.times["patch"])
+
+
+def test_profiler_for_patches_applied_while_running(Fool):
+    with Profiler() as profiler:
+        @patch_class(Fool)
+        class _Fool:
+            def meth(self):
+                return f"_{super().meth()}"
+
+        assert Fool().meth() == "__meth"
+
+    assert profiler.report().calls == 1
+
+
+def test_profiler_already_running():
+    with Profiler(), pytest.raises(RuntimeError):
+        Profiler().start()
+
+
+@pytest.mark.parametrize("sample_rate", (0, -1, 1.5))
+def test_profiler_with_invalid_sample_rate(sample_rate):
+    with pytest.raises(ValueError):
+        Profiler(sample_rate=sample_rate)
+
+
+def test_profile_report_without_samples():
+    report = ProfileReport(requests=0, calls=0, samples=0)
+    assert report.per_request() == {"patch": 0, "original": 0, "super": 0}
+    assert report.overhead_per_request == 0
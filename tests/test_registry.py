@@ -0,0 +1,70 @@
+# This file is part of indico-patcher.
+# Copyright (C) 2023 - 2026 UNCONVENTIONAL
+
+import pickle
+
+import pytest
+
+from indico_patcher.classes import patch_class
+from indico_patcher.classes import patched
+from indico_patcher.registry import PatchRegistry
+
+
+class Fool:
+    def meth(self):
+        return "meth"
+
+
+def test_registry_add_and_get():
+    registry = PatchRegistry()
+    assert registry.add("methods", "meth", 1) == (1,)
+    assert registry.add("methods", "meth", 2) == (1, 2)
+    assert registry.get("methods", "meth") == (1, 2)
+    assert registry["methods"]["meth"] == (1, 2)
+    assert registry.names("methods") == ["meth"]
+    assert list(registry) == ["methods"]
+
+
+def test_registry_read_does_not_create_entries():
+    registry = PatchRegistry()
+    assert registry.get("missing", "foo") == ()
+    assert registry["missing"] == {}
+    assert "foo" not in registry["missing"]
+    assert registry.names("methods") == []
+    assert len(registry) == 0
+    assert registry == PatchRegistry()
+
+
+def test_registry_views_are_read_only():
+    registry = PatchRegistry({"methods": {"meth": [1]}})
+    with pytest.raises(TypeError):
+        registry["methods"]["meth"] = (2,)
+    assert registry.get("methods", "meth") == (1,)
+
+
+def test_registry_repr():
+    registry = PatchRegistry({"attributes": {"attr": (None,)}})
+    assert repr(registry) == "PatchRegistry({'attributes': {'attr': (None,)}})"
+
+
+def test_registry_pickle():
+    registry = PatchRegistry({"attributes": {"attr": (1, 2)}, "missing": {"foo": (None,)}})
+    assert pickle.loads(pickle.dumps(registry)) == registry
+
+
+def test_registry_pickle_for_patched_class():
+    with patched():
+        @patch_class(Fool)
+        class _Fool:
+            def meth(self):
+                return f"_{super().meth()}"
+
+        data = pickle.dumps(Fool.__unpatched__)
+        registry = pickle.loads(data)
+        assert registry == Fool.__unpatched__
+        assert registry.owner is Fool
+        assert registry.get("methods", "meth")[0] is Fool.__unpatched__.get("methods", "meth")[0]
+
+    # Verify that versions that are no longer stored are not restored
+    with pytest.raises(ValueError):
+        pickle.loads(data)
@@ -1,20 +1,40 @@
 # This file is part of indico-patcher.
 # Copyright (C) 2023 - 2026 UNCONVENTIONAL
 
-from collections import defaultdict
+import dis
+from functools import cached_property
+from types import FunctionType
 from unittest import mock
 
 import pytest
+from sqlalchemy.ext.hybrid import hybrid_method
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql.elements import ClauseElement
 
+from indico.util.decorators import cached_classproperty
+from indico.util.decorators import classproperty
+
+from indico_patcher.registry import PatchRegistry
+from indico_patcher.util import MISSING
 from indico_patcher.util import SUPER_ENABLED_DESCRIPTORS
+from indico_patcher.util import BoundSuperProxy
+from indico_patcher.util import CachedClassProperty
+from indico_patcher.util import SuperGlobals
 from indico_patcher.util import SuperProxy
+from indico_patcher.util import _bind_super_calls
+from indico_patcher.util import _get_instructions
+from indico_patcher.util import _index_previous
 from indico_patcher.util import _inject_super_proxy
 from indico_patcher.util import _patch_attr
+from indico_patcher.util import _patch_cached_property
+from indico_patcher.util import _patch_classproperty
+from indico_patcher.util import _patch_hybrid_method
 from indico_patcher.util import _patch_methodlike
 from indico_patcher.util import _patch_propertylike
+from indico_patcher.util import _set_member
 from indico_patcher.util import _store_unpatched
+from indico_patcher.util import deferred_indexing
+from indico_patcher.util import get_member
 from indico_patcher.util import get_members
 from indico_patcher.util import patch_member
 
@@ -22,7 +42,8 @@ from indico_patcher.util import patch_member
 @pytest.fixture
 def Fool():
     class Fool:
-        __unpatched__ = defaultdict(lambda: defaultdict(list))
+        __unpatched__ = PatchRegistry()
+        __resolution__ = {}
         attr = None
 
         @property
@@ -33,6 +54,24 @@ def Fool():
         def hprop(self):
             pass
 
+        @hybrid_method
+        def hmeth(self, value):
+            pass
+
+        @cached_property
+        def cached(self):
+            pass
+
+        @classproperty
+        @classmethod
+        def cprop(cls):
+            pass
+
+        @cached_classproperty
+        @classmethod
+        def ccprop(cls):
+            pass
+
         @staticmethod
         def smeth():
             pass
@@ -78,6 +117,28 @@ def _Fool():
         def hprop(cls):
             return ClauseElement()
 
+        @hybrid_method
+        def hmeth(self, value):
+            pass
+
+        @hmeth.expression
+        def hmeth(cls, value):
+            return ClauseElement()
+
+        @cached_property
+        def cached(self):
+            pass
+
+        @classproperty
+        @classmethod
+        def cprop(cls):
+            pass
+
+        @cached_classproperty
+        @classmethod
+        def ccprop(cls):
+            pass
+
         @staticmethod
         def smeth():
             pass
@@ -138,11 +199,73 @@ def test_get_members_for_multiple_bases():
     assert C.foo == get_members(C)["foo"]
 
 
+def test_get_members_for_diamond_hierarchy():
+    class A:
+        foo = "a"
+
+    class B(A):
+        pass
+
+    class C(A):
+        foo = "c"
+
+    class D(B, C):
+        pass
+
+    assert D.foo == get_members(D)["foo"]
+
+
 def test_get_members_for_object():
     with pytest.raises(TypeError):
         get_members(object)
 
 
+def test_get_member():
+    class A:
+        foo = "a"
+        bar = None
+
+    class B(A):
+        foo = "b"
+
+    assert get_member(B, "foo") == "b"
+    assert get_member(B, "bar") is None
+    assert get_member(B, "baz") is MISSING
+    assert get_member(B, "__init__") is MISSING
+
+
+def test_get_member_for_members_set_outside_patches():
+    class A:
+        pass
+
+    class B(A):
+        pass
+
+    assert get_member(B, "foo") is MISSING
+    A.foo = "a"
+    assert get_member(B, "foo") == "a"
+    B.foo = "b"
+    assert get_member(B, "foo") == "b"
+
+
+def test_set_member_updates_member_index():
+    class A:
+        foo = "a"
+
+    class B(A):
+        pass
+
+    class C(B):
+        pass
+
+    assert get_members(C)["foo"] == "a"
+    _set_member(A, "foo", "patched")
+    _set_member(A, "bar", "new")
+    assert get_members(A)["foo"] == "patched"
+    assert get_members(C)["foo"] == "patched"
+    assert get_members(C)["bar"] == "new"
+
+
 # -- members -------------------------------------------------------------------
 
 def test_patch_member_for_attribute(Fool):
@@ -174,6 +297,30 @@ def test_patch_member_for_methodlike(_patch_methodlike, Fool):
     _patch_methodlike.assert_called_with(Fool, "cmeth", cmeth, "classmethods")
 
 
+@mock.patch("indico_patcher.util._patch_hybrid_method")
+def test_patch_member_for_hybrid_method(_patch_hybrid_method, Fool):
+    hmeth = Fool.__dict__["hmeth"]
+    patch_member(Fool, "hmeth", hmeth)
+    _patch_hybrid_method.assert_called_with(Fool, "hmeth", hmeth)
+
+
+@mock.patch("indico_patcher.util._patch_classproperty")
+def test_patch_member_for_classproperty(_patch_classproperty, Fool):
+    cprop = Fool.__dict__["cprop"]
+    patch_member(Fool, "cprop", cprop)
+    _patch_classproperty.assert_called_with(Fool, "cprop", cprop, "classproperties")
+    ccprop = Fool.__dict__["ccprop"]
+    patch_member(Fool, "ccprop", ccprop)
+    _patch_classproperty.assert_called_with(Fool, "ccprop", ccprop, "cached_classproperties")
+
+
+@mock.patch("indico_patcher.util._patch_cached_property")
+def test_patch_member_for_cached_property(_patch_cached_property, Fool):
+    cached = Fool.__dict__["cached"]
+    patch_member(Fool, "cached", cached)
+    _patch_cached_property.assert_called_with(Fool, "cached", cached)
+
+
 # -- attribute -----------------------------------------------------------------
 
 def test_patch_attr(Fool):
@@ -181,7 +328,7 @@ def test_patch_attr(Fool):
     obj = object()
     _patch_attr(Fool, "attr", obj)
     assert Fool.attr is obj
-    assert Fool.__unpatched__["attributes"]["attr"] == [orig_attr]
+    assert Fool.__unpatched__["attributes"]["attr"] == (orig_attr,)
 
 
 # -- property-like -------------------------------------------------------------
@@ -206,8 +353,8 @@ def test_patch_propertylike_for_property(_inject_super_proxy, _store_unpatched,
     expected_calls = []
     for fname in fnames:
         func = getattr(prop, fname)
-        if fname in SUPER_ENABLED_DESCRIPTORS:
-            expected_calls.append(mock.call(func, Fool))
+        if fname in SUPER_ENABLED_DESCRIPTORS and func:
+            expected_calls.append(mock.call(func, Fool, slot=fname))
             assert getattr(new_prop, fname) == mock_func
         else:
             assert getattr(new_prop, fname) == func
@@ -227,8 +374,8 @@ def test_patch_propertylike_for_hybrid_property(_inject_super_proxy, _store_unpa
     expected_calls = []
     for fname in fnames:
         func = getattr(hprop, fname)
-        if fname in SUPER_ENABLED_DESCRIPTORS:
-            expected_calls.append(mock.call(func, Fool))
+        if fname in SUPER_ENABLED_DESCRIPTORS and func:
+            expected_calls.append(mock.call(func, Fool, slot=fname))
             assert getattr(new_hprop, fname) == mock_func
         else:
             assert getattr(new_hprop, fname) == func
@@ -250,7 +397,7 @@ def test_patch_methodlike_for_method(_inject_super_proxy, _store_unpatched, Fool
     meth = _Fool.__dict__["meth"]
     _patch_methodlike(Fool, "meth", meth, "methods")
     _store_unpatched.assert_called_with(Fool, "meth", "methods")
-    _inject_super_proxy.assert_called_with(meth, Fool)
+    _inject_super_proxy.assert_called_with(meth, Fool, static=False)
     assert Fool.meth == mock_func
 
 
@@ -263,7 +410,7 @@ def test_patch_methodlike_for_classmethod(_inject_super_proxy, _store_unpatched,
     cmeth = _Fool.__dict__["cmeth"]
     _patch_methodlike(Fool, "cmeth", cmeth, "classmethods")
     _store_unpatched.assert_called_with(Fool, "cmeth", "classmethods")
-    _inject_super_proxy.assert_called_with(cmeth.__func__, Fool)
+    _inject_super_proxy.assert_called_with(cmeth.__func__, Fool, static=False)
     assert Fool.cmeth.__func__ == mock_func
 
 
@@ -275,29 +422,121 @@ def test_patch_methodlike_for_staticmethod(_inject_super_proxy, _store_unpatched
     smeth = _Fool.__dict__["smeth"]
     _patch_methodlike(Fool, "smeth", smeth, "staticmethods")
     _store_unpatched.assert_called_with(Fool, "smeth", "staticmethods")
-    _inject_super_proxy.assert_called_with(smeth.__func__, Fool)
+    _inject_super_proxy.assert_called_with(smeth.__func__, Fool, static=True)
     assert Fool.smeth == mock_func
 
 
+# -- cached property -----------------------------------------------------------
+
+@mock.patch("indico_patcher.util._store_unpatched")
+@mock.patch("indico_patcher.util._inject_super_proxy")
+def test_patch_cached_property(_inject_super_proxy, _store_unpatched, Fool, _Fool):
+    mock_func = mock.Mock()
+    _inject_super_proxy.return_value = mock_func
+    cached = _Fool.__dict__["cached"]
+    _patch_cached_property(Fool, "cached", cached)
+    _store_unpatched.assert_called_with(Fool, "cached", "cached_properties")
+    _inject_super_proxy.assert_called_with(cached.func, Fool)
+    new_cached = Fool.__dict__["cached"]
+    assert isinstance(new_cached, cached_property)
+    assert new_cached is not cached
+    assert new_cached.func == mock_func
+    assert new_cached.attrname == "cached"
+
+
+# -- class property ------------------------------------------------------------
+
+def test_patch_classproperty_for_invalid_values(Fool):
+    with pytest.raises(ValueError):
+        _patch_classproperty(Fool, None, None, "properties")
+
+
+@mock.patch("indico_patcher.util._store_unpatched")
+@mock.patch("indico_patcher.util._inject_super_proxy")
+def test_patch_classproperty(_inject_super_proxy, _store_unpatched, Fool, _Fool):
+    mock_func = mock.Mock()
+    _inject_super_proxy.return_value = mock_func
+    cprop = _Fool.__dict__["cprop"]
+    _patch_classproperty(Fool, "cprop", cprop, "classproperties")
+    _store_unpatched.assert_called_with(Fool, "cprop", "classproperties")
+    _inject_super_proxy.assert_called_with(cprop.fget.__func__, Fool, static=False, slot="fget")
+    assert type(Fool.__dict__["cprop"]) is classproperty
+    assert Fool.__dict__["cprop"].fget.__func__ == mock_func
+
+
+@mock.patch("indico_patcher.util._store_unpatched")
+@mock.patch("indico_patcher.util._inject_super_proxy")
+def test_patch_classproperty_for_cached_classproperty(_inject_super_proxy, _store_unpatched, Fool, _Fool):
+    mock_func = mock.Mock()
+    _inject_super_proxy.return_value = mock_func
+    ccprop = _Fool.__dict__["ccprop"]
+    _patch_classproperty(Fool, "ccprop", ccprop, "cached_classproperties")
+    _store_unpatched.assert_called_with(Fool, "ccprop", "cached_classproperties")
+    _inject_super_proxy.assert_called_with(ccprop.fget.__func__, Fool, static=False, slot="fget")
+    assert type(Fool.__dict__["ccprop"]) is CachedClassProperty
+    assert Fool.__dict__["ccprop"].fget.__func__ == mock_func
+
+
+def test_cached_classproperty_forget():
+    class Fool:
+        @CachedClassProperty
+        @classmethod
+        def ccprop(cls):
+            return object()
+
+    class Magician(Fool):
+        pass
+
+    values = (Fool.ccprop, Magician.ccprop)
+    assert (Fool.ccprop, Magician.ccprop) == values
+    CachedClassProperty.forget(Magician)
+    assert Fool.ccprop is values[0]
+    assert Magician.ccprop is not values[1]
+    CachedClassProperty.forget(Fool)
+    assert Fool.ccprop is not values[0]
+
+
+# -- hybrid method -------------------------------------------------------------
+
+@mock.patch("indico_patcher.util._store_unpatched")
+@mock.patch("indico_patcher.util._inject_super_proxy")
+def test_patch_hybrid_method(_inject_super_proxy, _store_unpatched, Fool, _Fool):
+    mock_func, mock_expr = mock.Mock(), mock.Mock()
+    _inject_super_proxy.side_effect = [mock_func, mock_expr]
+    hmeth = _Fool.__dict__["hmeth"]
+    _patch_hybrid_method(Fool, "hmeth", hmeth)
+    _store_unpatched.assert_called_with(Fool, "hmeth", "hybrid_methods")
+    _inject_super_proxy.assert_has_calls([mock.call(hmeth.func, Fool, slot="func"),
+                                          mock.call(hmeth.expr, Fool, slot="expr")])
+    new_hmeth = Fool.__dict__["hmeth"]
+    assert isinstance(new_hmeth, hybrid_method)
+    assert new_hmeth.func == mock_func
+    assert new_hmeth.expr == mock_expr
+
+
 # -- store unpatched member ----------------------------------------------------
 
 @pytest.mark.parametrize(("member_name", "category"), [
     ("attr", "attributes"),
     ("prop", "properties"),
     ("hprop", "hybrid_properties"),
+    ("hmeth", "hybrid_methods"),
+    ("cached", "cached_properties"),
     ("meth", "methods"),
     ("cmeth", "classmethods"),
     ("smeth", "staticmethods"),
 ])
 def test_store_unpatched_member(member_name, category, Fool):
     _store_unpatched(Fool, member_name, category)
-    assert Fool.__unpatched__[category][member_name] == [Fool.__dict__[member_name]]
+    assert Fool.__unpatched__[category][member_name] == (Fool.__dict__[member_name],)
 
 
 @pytest.mark.parametrize(("member_name", "category"), [
     ("attr", "attributes"),
     ("prop", "properties"),
     ("hprop", "hybrid_properties"),
+    ("hmeth", "hybrid_methods"),
+    ("cached", "cached_properties"),
     ("meth", "methods"),
     ("cmeth", "classmethods"),
     ("smeth", "staticmethods"),
@@ -308,7 +547,50 @@ def test_store_unpatched_member_from_parent(member_name, category, Fool):
             pass
 
     _store_unpatched(Magician, member_name, category)
-    assert Fool.__unpatched__[category][member_name] == [Fool.__dict__[member_name]]
+    assert Fool.__unpatched__[category][member_name] == (Fool.__dict__[member_name],)
+
+
+# -- resolution index ----------------------------------------------------------
+
+def test_store_unpatched_indexes_member(Fool):
+    orig_meth = Fool.__dict__["meth"]
+    _store_unpatched(Fool, "meth", "methods")
+    assert Fool.__resolution__[("meth", None)] == ("methods", orig_meth)
+    assert Fool.__resolution__[("meth", orig_meth.__code__)] is None
+
+
+def test_store_unpatched_indexes_missing_member(Fool):
+    _store_unpatched(Fool, "foo", "methods")
+    assert Fool.__resolution__[("foo", None)] == ("missing", None)
+
+
+def test_index_previous_for_stacked_patches(Fool):
+    orig_meth = Fool.__dict__["meth"]
+
+    def meth1(self):
+        pass
+
+    def meth2(self):
+        pass
+
+    Fool.__unpatched__ = PatchRegistry({"methods": {"meth": (orig_meth, meth1)}})
+    _index_previous(Fool, "meth")
+    # The latest patch is not stored and resolves to the newest stored version
+    assert Fool.__resolution__[("meth", None)] == ("methods", meth1)
+    assert Fool.__resolution__.get(("meth", meth2.__code__)) is None
+    # Older patches resolve to the version stored right before them
+    assert Fool.__resolution__[("meth", meth1.__code__)] == ("methods", orig_meth)
+    assert Fool.__resolution__[("meth", orig_meth.__code__)] is None
+
+
+def test_deferred_indexing(Fool):
+    orig_meth = Fool.__dict__["meth"]
+    with deferred_indexing():
+        _store_unpatched(Fool, "meth", "methods")
+        _store_unpatched(Fool, "meth", "methods")
+        # Only the entries needed by the latest caller and the latest stored version are published
+        assert set(Fool.__resolution__) == {("meth", None), ("meth", orig_meth.__code__)}
+    assert Fool.__resolution__[("meth", None)] == ("methods", orig_meth)
 
 
 # -- inject super proxy --------------------------------------------------------
@@ -318,7 +600,7 @@ def test_inject_super_proxy(Fool):
 
     class _Fool:
         def meth(self):
-            pass
+            return super(_Fool, self)  # noqa: UP008
 
     new_func = _inject_super_proxy(_Fool.meth, Fool)
     super_proxy = new_func.__globals__["super"]
@@ -327,5 +609,138 @@ def test_inject_super_proxy(Fool):
     assert super_proxy.orig_class == Fool
     assert new_func.__code__ == _Fool.meth.__code__
     assert new_func.__name__ == _Fool.meth.__name__
+    assert new_func.__module__ == _Fool.meth.__module__
     assert new_func.__defaults__ == _Fool.meth.__defaults__
     assert new_func.__closure__ == _Fool.meth.__closure__
+
+
+def test_inject_super_proxy_without_global_super(Fool):
+    class _Fool:
+        def meth(self):
+            return super().meth()
+
+        def pmeth(self, value):
+            super().prop = value
+            del super().prop
+
+        def nmeth(self):
+            pass
+
+    for func in (_Fool.meth, _Fool.pmeth, _Fool.nmeth):
+        new_func = _inject_super_proxy(func, Fool)
+        assert new_func.__globals__ is func.__globals__
+
+
+def test_inject_super_proxy_with_shared_globals(Fool):
+    class _Fool:
+        def meth(self):
+            return super(_Fool, self)  # noqa: UP008
+
+        def nmeth(self):
+            return lambda: super(_Fool, self)  # noqa: UP008
+
+    class Magician:
+        pass
+
+    new_meth = _inject_super_proxy(_Fool.meth, Fool)
+    new_nmeth = _inject_super_proxy(_Fool.nmeth, Fool)
+    assert new_meth.__globals__ is new_nmeth.__globals__
+    assert new_meth.__globals__ is not _inject_super_proxy(_Fool.meth, Magician).__globals__
+
+
+def test_inject_super_proxy_with_live_globals(Fool):
+    class _Fool:
+        def meth(self):
+            super(_Fool, self)  # noqa: UP008
+            return late_global  # noqa: F821
+
+    new_func = _inject_super_proxy(_Fool.meth, Fool)
+    globals()["late_global"] = "late"
+    try:
+        assert new_func(Fool()) == "late"
+    finally:
+        del globals()["late_global"]
+
+
+# -- bind super calls ----------------------------------------------------------
+
+def test_bind_super_calls(Fool):
+    class _Fool:
+        def meth(self):
+            return super().meth()
+
+    proxy = BoundSuperProxy(Fool)
+    code, uses_global_super = _bind_super_calls(_Fool.meth.__code__, proxy)
+    assert code is not _Fool.meth.__code__
+    assert not uses_global_super
+    assert code.co_consts[-1] is proxy
+    assert proxy.code is code
+    assert "super" not in {instr.argval for instr in dis.get_instructions(code) if instr.opname == "LOAD_GLOBAL"}
+
+
+def test_bind_super_calls_for_calls_without_attribute(Fool):
+    class _Fool:
+        def meth(self, value):
+            if value:
+                super().prop = value
+                del super().prop
+            return super()
+
+    proxy = BoundSuperProxy(Fool)
+    code, uses_global_super = _bind_super_calls(_Fool.meth.__code__, proxy)
+    assert code.co_consts[-1] is proxy
+    assert not uses_global_super
+    assert "super" not in {instr.argval for instr in dis.get_instructions(code) if instr.opname == "LOAD_GLOBAL"}
+    fool = Fool()
+    duper = FunctionType(code, {}, closure=_Fool.meth.__closure__)(fool, None)
+    assert repr(duper) == f"<duper: {_Fool.__module__}.{_Fool.__name__}, {fool}>"
+
+
+def test_bind_super_calls_without_zero_args_super(Fool):
+    class _Fool:
+        def meth(self):
+            return super(_Fool, self).meth()  # noqa: UP008
+
+        def smeth():
+            return super()
+
+    for func in (_Fool.meth, _Fool.smeth):
+        proxy = BoundSuperProxy(Fool)
+        code, uses_global_super = _bind_super_calls(func.__code__, proxy)
+        assert code is func.__code__
+        assert uses_global_super
+        assert proxy.code is None
+
+
+def test_bind_super_calls_on_unsupported_interpreter(Fool):
+    class _Fool:
+        def meth(self):
+            return super().meth()
+
+    proxy = BoundSuperProxy(Fool)
+    with mock.patch("indico_patcher.util.BIND_SUPER_CALLS", False):
+        code, uses_global_super = _bind_super_calls(_Fool.meth.__code__, proxy)
+        new_func = _inject_super_proxy(_Fool.meth, Fool)
+    assert code is _Fool.meth.__code__
+    assert uses_global_super
+    assert proxy.code is None
+    assert isinstance(new_func.__globals__, SuperGlobals)
+
+
+def test_get_instructions():
+    calls = ", ".join(f"call({idx})" for idx in range(300))
+
+    def func(self, value):
+        super().prop = value
+        return super().meth(value), [idx for idx in range(value)]
+
+    extended = eval(f"lambda call: ({calls})")
+    for code in (func.__code__, extended.__code__):
+        assert _get_instructions(code) == [(instr.offset, instr.opcode, instr.arg or 0)
+                                           for instr in dis.get_instructions(code)]
+
+
+def test_bound_superproxy_for_staticmethod(Fool):
+    fool = Fool()
+    duper = BoundSuperProxy(Fool, static=True)(Fool, fool)
+    assert repr(duper) == f"<duper: {Fool.__module__}.{Fool.__name__}, None>"